@@ -5,22 +5,65 @@ This module implements a web interface using Flask for the AI agent.
 """
 
 from flask import Flask, render_template, request, jsonify, send_from_directory
+from flask.json.provider import DefaultJSONProvider
+import orjson
 import os
 import json
 import networkx as nx
-import matplotlib.pyplot as plt
-import matplotlib
-matplotlib.use('Agg')  # Use non-interactive backend
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 import io
-import base64
-from datetime import datetime
+import hashlib
+import tempfile
+import numpy as np
+from flask_caching import Cache
 
 from miu_system import next_states, is_valid_miu_string
 from miu_problem import MIUProblem, miu_heuristic
 from maze_environment import Maze, MazeProblem, manhattan_distance
-from search import breadth_first_search, depth_first_search, a_star_search
+from search import (breadth_first_search, bidirectional_breadth_first_search, depth_first_search,
+                    a_star_search)
 
+try:
+    from search_numba import grid_breadth_first_search, grid_depth_first_search
+except ImportError:
+    # Numba is optional, the Python searches give the same paths without it
+    grid_breadth_first_search, grid_depth_first_search = breadth_first_search, depth_first_search
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider that serializes responses with orjson."""
+    
+    def dumps(self, obj, **kwargs):
+        """Serialize obj to a JSON string, numpy arrays included."""
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        """Deserialize a JSON string or bytes."""
+        return orjson.loads(s)
+
+# The search responses carry the visited nodes, the path and the whole grid,
+# so serialization is done by orjson instead of the stdlib json module
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
+
+# Identical search requests are common during demo sessions, so responses are
+# cached for a short while instead of rerunning the search and the rendering
+cache = Cache(app, config={'CACHE_TYPE': 'SimpleCache', 'CACHE_DEFAULT_TIMEOUT': 60})
+
+def request_cache_key(prefix):
+    """
+    Create a cache key function for a POST endpoint.
+    
+    Args:
+        prefix (str): Prefix that keeps the keys of different endpoints apart
+        
+    Returns:
+        function: A function returning a key derived from the JSON payload
+    """
+    def make_key():
+        payload = json.dumps(request.get_json(silent=True), sort_keys=True)
+        return prefix + hashlib.blake2b(payload.encode('utf-8')).hexdigest()
+    return make_key
 
 # Create static directory if it doesn't exist
 os.makedirs('static', exist_ok=True)
@@ -49,6 +92,7 @@ def api_miu_next_states():
     return jsonify({'next_states': result})
 
 @app.route('/api/miu/search', methods=['POST'])
+@cache.cached(timeout=60, key_prefix=request_cache_key('miu:'))
 def api_miu_search():
     """API endpoint for running a search in the MIU system."""
     data = request.get_json()
@@ -66,6 +110,8 @@ def api_miu_search():
     # Run the search algorithm
     if algorithm == 'bfs':
         solution, visited_nodes, iterations = breadth_first_search(problem, max_iterations)
+    elif algorithm == 'bibfs':
+        solution, visited_nodes, iterations = bidirectional_breadth_first_search(problem, max_iterations)
     elif algorithm == 'dfs':
         solution, visited_nodes, iterations = depth_first_search(problem, max_iterations=max_iterations)
     elif algorithm == 'astar':
@@ -80,8 +126,11 @@ def api_miu_search():
         'solution_found': solution is not None
     }
     
+    # Walk the parent chain once and reuse the path below
+    path = solution.path() if solution else []
+    path_states = [node.state for node in path]
+    
     if solution:
-        path = solution.path()
         result['path_length'] = len(path) - 1
         result['path'] = []
         
@@ -99,9 +148,12 @@ def api_miu_search():
                     'state': node.state
                 })
     
-    # Generate a visualization of the search
-    graph_image = generate_miu_graph(visited_nodes, solution)
-    result['graph_image'] = graph_image
+    # Send the search graph as data, the browser renders it
+    result['graph'] = miu_graph_json(visited_nodes, path_states)
+    
+    # Server-side rendering is only done on request
+    if data.get('render_image'):
+        result['graph_url'] = generate_miu_graph(visited_nodes, path_states)
     
     return jsonify(result)
 
@@ -128,21 +180,30 @@ def api_maze_generate():
             row.append(maze.grid[y][x])
         maze_grid.append(row)
     
-    # Generate a visualization of the maze
-    maze_image = generate_maze_image(maze)
-    
-    return jsonify({
+    result = {
         'width': maze.width,
         'height': maze.height,
         'grid': maze_grid,
         'start': maze.start,
-        'goal': maze.goal,
-        'maze_image': maze_image
-    })
+        'goal': maze.goal
+    }
+    
+    # The browser renders the grid itself, an image is only made on request
+    if data.get('render_image'):
+        result['maze_image_url'] = generate_maze_image(maze)
+    
+    return jsonify(result)
 
 @app.route('/api/maze/search', methods=['POST'])
+@cache.cached(timeout=60, key_prefix=request_cache_key('maze:'))
 def api_maze_search():
-    """API endpoint for running a search in a maze."""
+    """
+    API endpoint for running a search in a maze.
+    
+    visited_nodes_count is the number of distinct cells the search reached,
+    for every algorithm: the compiled BFS and DFS keep each cell once, while
+    the Python searches also return a node for every repeated cell.
+    """
     data = request.get_json()
     grid = data.get('grid', [])
     start = tuple(data.get('start', [0, 0]))
@@ -153,21 +214,18 @@ def api_maze_search():
         return jsonify({'error': 'Invalid maze grid'})
     
     # Recreate the maze from the grid
-    height = len(grid)
-    width = len(grid[0]) if height > 0 else 0
-    maze = Maze(width, height, 0, 42)  # Seed doesn't matter here
-    maze.grid = grid
-    maze.start = start
-    maze.goal = goal
+    maze = Maze.from_grid(grid, start, goal)
     
     # Create the problem
     problem = MazeProblem(maze)
     
-    # Run the search algorithm
+    # Run the search algorithm, BFS and DFS on the compiled grid kernels when available
     if algorithm == 'bfs':
-        solution, visited_nodes, iterations = breadth_first_search(problem)
+        solution, visited_nodes, iterations = grid_breadth_first_search(problem)
+    elif algorithm == 'bibfs':
+        solution, visited_nodes, iterations = bidirectional_breadth_first_search(problem)
     elif algorithm == 'dfs':
-        solution, visited_nodes, iterations = depth_first_search(problem)
+        solution, visited_nodes, iterations = grid_depth_first_search(problem)
     elif algorithm == 'astar':
         solution, visited_nodes, iterations = a_star_search(problem, manhattan_distance)
     else:
@@ -176,12 +234,14 @@ def api_maze_search():
     # Prepare the result
     result = {
         'iterations': iterations,
-        'visited_nodes_count': len(visited_nodes),
         'solution_found': solution is not None
     }
     
+    # Walk the parent chain once and reuse the path below
+    path = solution.path() if solution else []
+    path_states = [node.state for node in path]
+    
     if solution:
-        path = solution.path()
         result['path_length'] = len(path) - 1
         result['path'] = []
         
@@ -199,22 +259,129 @@ def api_maze_search():
                     'state': node.state
                 })
     
-    # Generate a visualization of the maze with the solution path
-    maze_solution_image = generate_maze_solution(maze, solution, visited_nodes)
-    result['maze_solution_image'] = maze_solution_image
+    # Send the visited cells and the solution path as data
+    result.update(maze_search_json(maze, path_states, visited_nodes))
+    result['visited_nodes_count'] = len(result['visited'])
+    
+    # Server-side rendering is only done on request
+    if data.get('render_image'):
+        result['maze_solution_url'] = generate_maze_solution(maze, path_states, visited_nodes)
     
     return jsonify(result)
 
-def generate_miu_graph(visited_nodes, solution):
+def miu_graph_json(visited_nodes, path_states):
+    """
+    Describe the MIU search graph as plain data for client-side rendering.
+    
+    Args:
+        visited_nodes (list): List of visited nodes
+        path_states (list): States on the solution path, empty if no solution was found
+        
+    Returns:
+        dict: The graph nodes, the (parent, state) edges and the solution path
+    """
+    nodes = []
+    edges = []
+    seen_nodes = set()
+    seen_edges = set()
+    for node in visited_nodes:
+        if node.state not in seen_nodes:
+            seen_nodes.add(node.state)
+            nodes.append(node.state)
+        if node.parent:
+            edge = (node.parent.state, node.state)
+            if edge not in seen_edges:
+                seen_edges.add(edge)
+                edges.append(list(edge))
+    
+    return {'nodes': nodes, 'edges': edges, 'path': list(path_states)}
+
+def maze_search_json(maze, path_states, visited_nodes):
+    """
+    Describe a maze search as plain data for client-side rendering.
+    
+    Args:
+        maze (Maze): The maze
+        path_states (list): Cells on the solution path, empty if no solution was found
+        visited_nodes (list): List of visited nodes
+        
+    Returns:
+        dict: The visited and solution cells as [x, y] coordinate lists
+    """
+    visited = []
+    seen = set()
+    for node in visited_nodes:
+        if node.state not in seen:
+            seen.add(node.state)
+            visited.append(list(node.state))
+    
+    solution_cells = [list(state) for state in path_states]
+    
+    return {'visited': visited, 'solution': solution_cells}
+
+def tree_layout(visited_nodes):
+    """
+    Compute node positions for a search tree, one row per search depth.
+    
+    This is O(V) and deterministic, unlike a force-directed layout.
+    
+    Args:
+        visited_nodes (list): List of visited nodes
+        
+    Returns:
+        dict: Mapping from state to (x, y) position
+    """
+    rows = []
+    depth_of = {}
+    for node in visited_nodes:
+        if node.state in depth_of:
+            continue
+        depth_of[node.state] = node.depth
+        while len(rows) <= node.depth:
+            rows.append([])
+        rows[node.depth].append(node.state)
+    
+    pos = {}
+    for depth, row in enumerate(rows):
+        for i, state in enumerate(row):
+            pos[state] = ((i + 1) / (len(row) + 1), -depth)
+    return pos
+
+def save_png(png_bytes, name):
+    """
+    Store a rendered PNG under a content-hashed name in static/images.
+    
+    Identical renders map to the same file, so each image is written once and
+    the URL can be cached by the browser indefinitely.
+    
+    Args:
+        png_bytes (bytes): The PNG data
+        name (str): Prefix of the file name
+        
+    Returns:
+        str: URL of the PNG image
+    """
+    digest = hashlib.blake2b(png_bytes, digest_size=8).hexdigest()
+    filename = f"static/images/{name}_{digest}.png"
+    if not os.path.exists(filename):
+        # Write to a temporary file first so no request sees a partial image
+        fd, tmp_path = tempfile.mkstemp(dir='static/images', suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(png_bytes)
+        os.replace(tmp_path, filename)
+    
+    return '/' + filename
+
+def generate_miu_graph(visited_nodes, path_states):
     """
     Generate a visualization of the MIU search graph.
     
     Args:
         visited_nodes (list): List of visited nodes
-        solution (Node): The solution node, or None if no solution was found
+        path_states (list): States on the solution path, empty if no solution was found
         
     Returns:
-        str: Base64-encoded PNG image
+        str: URL of the PNG image
     """
     # Build the graph
     graph = nx.DiGraph()
@@ -222,47 +389,75 @@ def generate_miu_graph(visited_nodes, solution):
         if node.parent:
             graph.add_edge(node.parent.state, node.state)
     
-    # Use spring layout for small graphs, shell layout for larger ones
-    if len(graph) < 20:
-        pos = nx.spring_layout(graph)
-    else:
-        pos = nx.shell_layout(graph)
+    # The search produces a tree, so lay it out by depth in one pass
+    pos = tree_layout(visited_nodes)
     
-    plt.figure(figsize=(10, 8))
+    # Render without pyplot, so concurrent requests do not share global state
+    fig = Figure(figsize=(10, 8))
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.subplots()
     
     # Draw the graph
-    nx.draw(graph, pos, with_labels=True, 
+    nx.draw(graph, pos, ax=ax, with_labels=True, 
            node_color="lightblue", node_size=500, font_size=8,
            edge_color="gray", arrows=True)
     
     # Highlight the path if a solution is found
-    if solution:
-        path_states = [n.state for n in solution.path()]
+    if path_states:
         path_edges = [(path_states[i], path_states[i+1]) for i in range(len(path_states)-1)]
         
-        nx.draw_networkx_nodes(graph, pos, nodelist=path_states,
+        nx.draw_networkx_nodes(graph, pos, ax=ax, nodelist=path_states,
                              node_color="green", node_size=500)
-        nx.draw_networkx_edges(graph, pos, edgelist=path_edges,
+        nx.draw_networkx_edges(graph, pos, ax=ax, edgelist=path_edges,
                              edge_color="green", width=2)
     
-    plt.title("MIU System Search Graph")
+    ax.set_title("MIU System Search Graph")
     
     # Save the figure to a BytesIO object
     buf = io.BytesIO()
-    plt.savefig(buf, format='png')
-    plt.close()
+    canvas.print_png(buf)
     
-    # Convert to base64 for embedding in HTML
-    buf.seek(0)
-    img_str = base64.b64encode(buf.read()).decode('utf-8')
-    
-    # Save to a file as well
-    timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-    filename = f"static/images/miu_graph_{timestamp}.png"
-    with open(filename, 'wb') as f:
-        f.write(base64.b64decode(img_str))
+    return save_png(buf.getvalue(), "miu_graph")
+
+# RGB colors of the maze cells
+MAZE_COLORS = {
+    'wall': (0, 0, 0),
+    'start': (0, 128, 0),
+    'goal': (255, 0, 0),
+    'path': (255, 255, 0),
+    'visited': (173, 216, 230),
+    'empty': (255, 255, 255)
+}
+
+def draw_maze_cells(ax, maze, visited_positions=(), solution_positions=()):
+    """
+    Draw the cells of a maze onto an axes with a single imshow call.
     
-    return img_str
+    Args:
+        ax: The matplotlib axes to draw on
+        maze (Maze): The maze
+        visited_positions (iterable): (x, y) cells to mark as visited
+        solution_positions (iterable): (x, y) cells to mark as the solution path
+    """
+    cells = np.array(maze.grid)
+    img = np.empty((maze.height, maze.width, 3), np.uint8)
+    img[:] = MAZE_COLORS['empty']
+    
+    # Later assignments win, so the start, goal and walls stay on top
+    for color, positions in (('visited', visited_positions), ('path', solution_positions)):
+        coords = np.array(list(positions), dtype=np.intp).reshape(-1, 2)
+        img[coords[:, 1], coords[:, 0]] = MAZE_COLORS[color]
+    img[cells == '#'] = MAZE_COLORS['wall']
+    img[cells == 'S'] = MAZE_COLORS['start']
+    img[cells == 'G'] = MAZE_COLORS['goal']
+    
+    # The extent puts cell (x, y) at [x, x+1] x [y, y+1] with y growing downwards
+    ax.imshow(img, interpolation='nearest', extent=(0, maze.width, maze.height, 0))
+    ax.set_aspect('equal')
+    
+    for label in ('S', 'G'):
+        for y, x in np.argwhere(cells == label):
+            ax.text(x + 0.5, y + 0.5, label, ha='center', va='center')
 
 def generate_maze_image(maze):
     """
@@ -272,134 +467,60 @@ def generate_maze_image(maze):
         maze (Maze): The maze
         
     Returns:
-        str: Base64-encoded PNG image
+        str: URL of the PNG image
     """
-    plt.figure(figsize=(10, 10))
-    
-    # Create a grid of colored cells
-    for y in range(maze.height):
-        for x in range(maze.width):
-            cell = maze.grid[y][x]
-            if cell == '#':
-                plt.fill([x, x+1, x+1, x], [y, y, y+1, y+1], 'black')
-            elif cell == 'S':
-                plt.fill([x, x+1, x+1, x], [y, y, y+1, y+1], 'green')
-                plt.text(x + 0.5, y + 0.5, 'S', ha='center', va='center')
-            elif cell == 'G':
-                plt.fill([x, x+1, x+1, x], [y, y, y+1, y+1], 'red')
-                plt.text(x + 0.5, y + 0.5, 'G', ha='center', va='center')
-            else:
-                plt.fill([x, x+1, x+1, x], [y, y, y+1, y+1], 'white')
+    fig = Figure(figsize=(10, 10))
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.subplots()
     
-    # Set the limits and aspect ratio
-    plt.xlim(0, maze.width)
-    plt.ylim(0, maze.height)
-    plt.gca().invert_yaxis()  # Invert y-axis to match grid coordinates
-    plt.gca().set_aspect('equal')
+    # Draw all cells as one image
+    draw_maze_cells(ax, maze)
     
     # Remove ticks
-    plt.xticks([])
-    plt.yticks([])
+    ax.set_xticks([])
+    ax.set_yticks([])
     
-    plt.title("Maze")
+    ax.set_title("Maze")
     
     # Save the figure to a BytesIO object
     buf = io.BytesIO()
-    plt.savefig(buf, format='png')
-    plt.close()
-    
-    # Convert to base64 for embedding in HTML
-    buf.seek(0)
-    img_str = base64.b64encode(buf.read()).decode('utf-8')
+    canvas.print_png(buf)
     
-    # Save to a file as well
-    timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-    filename = f"static/images/maze_{timestamp}.png"
-    with open(filename, 'wb') as f:
-        f.write(base64.b64decode(img_str))
-    
-    return img_str
+    return save_png(buf.getvalue(), "maze")
 
-def generate_maze_solution(maze, solution, visited_nodes):
+def generate_maze_solution(maze, path_states, visited_nodes):
     """
     Generate a visualization of a maze with solution path.
     
     Args:
         maze (Maze): The maze
-        solution (Node): The solution node, or None if no solution was found
+        path_states (list): Cells on the solution path, empty if no solution was found
         visited_nodes (list): List of visited nodes
         
     Returns:
-        str: Base64-encoded PNG image
+        str: URL of the PNG image
     """
-    # Create a copy of the maze grid for visualization
-    grid = [row[:] for row in maze.grid]
-    
     # Mark visited nodes
-    visited_positions = set()
-    for node in visited_nodes:
-        if node.state != maze.start and node.state != maze.goal:
-            x, y = node.state
-            visited_positions.add((x, y))
+    visited_positions = [node.state for node in visited_nodes]
     
-    # Mark the solution path
-    solution_positions = set()
-    if solution:
-        path = solution.path()
-        for node in path:
-            if node.state != maze.start and node.state != maze.goal:
-                x, y = node.state
-                solution_positions.add((x, y))
+    fig = Figure(figsize=(10, 10))
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.subplots()
     
-    plt.figure(figsize=(10, 10))
-    
-    # Create a grid of colored cells
-    for y in range(maze.height):
-        for x in range(maze.width):
-            cell = grid[y][x]
-            if cell == '#':
-                plt.fill([x, x+1, x+1, x], [y, y, y+1, y+1], 'black')
-            elif cell == 'S':
-                plt.fill([x, x+1, x+1, x], [y, y, y+1, y+1], 'green')
-                plt.text(x + 0.5, y + 0.5, 'S', ha='center', va='center')
-            elif cell == 'G':
-                plt.fill([x, x+1, x+1, x], [y, y, y+1, y+1], 'red')
-                plt.text(x + 0.5, y + 0.5, 'G', ha='center', va='center')
-            elif (x, y) in solution_positions:
-                plt.fill([x, x+1, x+1, x], [y, y, y+1, y+1], 'yellow')
-            elif (x, y) in visited_positions:
-                plt.fill([x, x+1, x+1, x], [y, y, y+1, y+1], 'lightblue')
-            else:
-                plt.fill([x, x+1, x+1, x], [y, y, y+1, y+1], 'white')
-    
-    # Set the limits and aspect ratio
-    plt.xlim(0, maze.width)
-    plt.ylim(0, maze.height)
-    plt.gca().invert_yaxis()  # Invert y-axis to match grid coordinates
-    plt.gca().set_aspect('equal')
+    # Draw all cells as one image
+    draw_maze_cells(ax, maze, visited_positions, path_states)
     
     # Remove ticks
-    plt.xticks([])
-    plt.yticks([])
+    ax.set_xticks([])
+    ax.set_yticks([])
     
-    plt.title("Maze with Solution Path")
+    ax.set_title("Maze with Solution Path")
     
     # Save the figure to a BytesIO object
     buf = io.BytesIO()
-    plt.savefig(buf, format='png')
-    plt.close()
-    
-    # Convert to base64 for embedding in HTML
-    buf.seek(0)
-    img_str = base64.b64encode(buf.read()).decode('utf-8')
-    
-    # Save to a file as well
-    timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-    filename = f"static/images/maze_solution_{timestamp}.png"
-    with open(filename, 'wb') as f:
-        f.write(base64.b64decode(img_str))
+    canvas.print_png(buf)
     
-    return img_str
+    return save_png(buf.getvalue(), "maze_solution")
 
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
@@ -0,0 +1,107 @@
+"""
+Bloom Filter Module
+
+This module implements a Bloom filter, a set that stores a few bits per item
+instead of the items themselves. It can answer "present" for an item that
+was never added (a false positive), but never the other way round.
+"""
+
+import math
+
+_MASK64 = 0xFFFFFFFFFFFFFFFF
+
+
+def _mix64(x):
+    """
+    Scramble a 64-bit value with the splitmix64 finalizer.
+    
+    CPython hashes small ints to themselves, so without this the high half of
+    an int's hash is 0 and every probe of a double hash would be adjacent.
+    
+    Args:
+        x (int): A value in [0, 2**64)
+        
+    Returns:
+        int: The mixed value, every output bit depending on every input bit
+    """
+    x = (x + 0x9E3779B97F4A7C15) & _MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return x ^ (x >> 31)
+
+
+class BloomFilter:
+    """
+    A Bloom filter over hashable items.
+    
+    It supports add and the in operator, so it can stand in for the seen set of
+    breadth_first_search when memory matters more than exactness.
+    """
+    
+    def __init__(self, capacity, bits_per_item=10, hashes=4):
+        """
+        Create an empty filter.
+        
+        Args:
+            capacity (int): Number of items the filter is sized for
+            bits_per_item (int): Bits of storage per item; 10 bits with 4
+                hashes gives about 1% false positives at capacity
+            hashes (int): Number of bits set per item
+        """
+        self.size = max(8, capacity * bits_per_item)
+        self.hashes = hashes
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+    
+    def _positions(self, item):
+        """
+        Yield the bit positions of an item.
+        
+        The positions come from the two halves of the item's mixed hash,
+        combined as h1 + i * h2 (double hashing), so the item is hashed only once.
+        
+        Args:
+            item: A hashable item
+        """
+        h = _mix64(hash(item) & _MASK64)
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.size
+    
+    def add(self, item):
+        """
+        Add an item to the filter.
+        
+        Args:
+            item: A hashable item
+        """
+        bits = self.bits
+        for p in self._positions(item):
+            bits[p >> 3] |= 1 << (p & 7)
+        self.count += 1
+    
+    def __contains__(self, item):
+        """
+        Return True if the item was probably added.
+        
+        Args:
+            item: A hashable item
+            
+        Returns:
+            bool: False if the item was certainly never added
+        """
+        bits = self.bits
+        return all(bits[p >> 3] & (1 << (p & 7)) for p in self._positions(item))
+    
+    def __len__(self):
+        """Return the number of add calls."""
+        return self.count
+    
+    def false_positive_rate(self):
+        """
+        Estimate the current false positive rate.
+        
+        Returns:
+            float: The expected chance that an item never added tests as present
+        """
+        return (1 - math.exp(-self.hashes * self.count / self.size)) ** self.hashes
@@ -4,6 +4,8 @@ Demo script for the AI Agent.
 This script demonstrates the AI agent's capabilities by running predefined examples.
 """
 
+import argparse
+
 from miu_system import next_states
 from miu_problem import MIUProblem, miu_heuristic
 from maze_environment import Maze, MazeProblem, manhattan_distance
@@ -21,7 +23,7 @@ def demo_miu_system():
     
     for example in examples:
         result = next_states(example)
-        print(f"next_states(\"{example}\") → {result}")
+        print(f"next_states(\"{example}\") → {list(result)}")
     
     # Demonstrate search algorithms
     print("\nDemonstrating search algorithms:")
@@ -74,8 +76,13 @@ def demo_miu_system():
         print(f"No solution found after {iterations} iterations.")
 
 
-def demo_maze_environment():
-    """Demonstrate the maze environment."""
+def demo_maze_environment(all_algorithms=False):
+    """
+    Demonstrate the maze environment.
+    
+    Args:
+        all_algorithms (bool): Also run BFS and DFS after A*
+    """
     print("\n" + "=" * 50)
     print("Maze Environment Demonstration")
     print("=" * 50)
@@ -95,23 +102,25 @@ def demo_maze_environment():
     # Create the problem
     problem = MazeProblem(maze)
     
-    # Run different search algorithms
-    algorithms = [
-        ("Breadth-First Search (BFS)", breadth_first_search),
-        ("Depth-First Search (DFS)", depth_first_search),
-        ("A* Search", lambda p: a_star_search(p, manhattan_distance))
-    ]
+    # A* finds an optimal path, so it runs first; BFS and DFS only repeat the
+    # work on the same maze and are run on request
+    algorithms = [("A* Search", a_star_search, {"heuristic": manhattan_distance})]
+    if all_algorithms:
+        algorithms += [
+            ("Breadth-First Search (BFS)", breadth_first_search, {}),
+            ("Depth-First Search (DFS)", depth_first_search, {})
+        ]
     
-    for name, algorithm in algorithms:
+    for name, algorithm, kwargs in algorithms:
         print(f"\nUsing {name}:")
-        solution, visited_nodes, iterations = algorithm(problem)
+        solution, visited_nodes, iterations = algorithm(problem, **kwargs)
         
         if solution:
             print(f"Solution found in {iterations} iterations!")
-            print(f"Path length: {len(solution.path()) - 1} steps")
             
             # Show the first few steps of the path
             path = solution.path()
+            print(f"Path length: {len(path) - 1} steps")
             print("First few steps:")
             for i, node in enumerate(path[:5]):
                 if i > 0:
@@ -127,6 +136,11 @@ def demo_maze_environment():
 
 def main():
     """Main function."""
+    parser = argparse.ArgumentParser(description="AI Agent Demonstration")
+    parser.add_argument("--all-algorithms", action="store_true",
+                        help="also run BFS and DFS in the maze demonstration")
+    args = parser.parse_args()
+    
     print("=" * 50)
     print("AI Agent Demonstration")
     print("=" * 50)
@@ -139,7 +153,7 @@ def main():
     demo_miu_system()
     
     # Demonstrate maze environment
-    demo_maze_environment()
+    demo_maze_environment(args.all_algorithms)
     
     print("\n" + "=" * 50)
     print("Demo completed!")
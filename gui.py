@@ -6,10 +6,9 @@ This module implements a graphical user interface for the AI agent using Tkinter
 
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
-import networkx as nx
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import time
+import math
+import random
+import queue
 import threading
 
 from miu_system import next_states, is_valid_miu_string
@@ -17,6 +16,28 @@ from miu_problem import MIUProblem, miu_heuristic
 from maze_environment import Maze, MazeProblem, manhattan_distance
 from search import breadth_first_search, depth_first_search, a_star_search
 
+# NetworkX and Matplotlib are slow to import and only draw the MIU graph, so
+# load_plotting imports them on the first MIU search
+nx = None
+Figure = None
+FigureCanvasTkAgg = None
+
+# Graph size after which the MIU graph is laid out in rows by search depth
+LAYERED_LAYOUT_NODES = 500
+
+# Interval in milliseconds at which the GUI checks for a search result
+EVENT_POLL_MS = 16
+
+
+def load_plotting():
+    """Import the modules used to draw the MIU graph, if not done yet."""
+    global nx, Figure, FigureCanvasTkAgg
+    if nx is None:
+        import networkx as nx
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+
 class AIAgentGUI:
     """GUI for the AI Agent."""
     
@@ -50,9 +71,14 @@ class AIAgentGUI:
         self.setup_maze_tab()
         
         # Variables for search visualization
-        self.graph = nx.DiGraph()
+        self.graph = None
         self.pos = None
+        self._bg = None
         self.search_running = False
+        self.stop_requested = False
+        
+        # Search threads hand their results to the Tk main loop through this queue
+        self.events = queue.Queue()
         
     def setup_miu_tab(self):
         """Set up the MIU System tab."""
@@ -105,10 +131,9 @@ class AIAgentGUI:
         graph_frame = ttk.Frame(output_paned)
         output_paned.add(graph_frame, weight=2)
         
-        self.figure = plt.Figure(figsize=(6, 4), dpi=100)
-        self.ax = self.figure.add_subplot(111)
-        self.canvas = FigureCanvasTkAgg(self.figure, graph_frame)
-        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        # The graph figure is created by setup_miu_graph on the first search
+        self.graph_frame = graph_frame
+        self.figure = None
         
         # Right side: Text output
         text_frame = ttk.Frame(output_paned)
@@ -117,6 +142,17 @@ class AIAgentGUI:
         self.output_text = scrolledtext.ScrolledText(text_frame, wrap=tk.WORD)
         self.output_text.pack(fill=tk.BOTH, expand=True)
         
+    def setup_miu_graph(self):
+        """Create the MIU graph figure, if not done yet."""
+        if self.figure is not None:
+            return
+        
+        load_plotting()
+        self.figure = Figure(figsize=(6, 4), dpi=100)
+        self.ax = self.figure.add_subplot(111)
+        self.canvas = FigureCanvasTkAgg(self.figure, self.graph_frame)
+        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        
     def setup_maze_tab(self):
         """Set up the Maze Environment tab."""
         # Create frames
@@ -174,6 +210,7 @@ class AIAgentGUI:
         # Initialize maze
         self.maze = None
         self.cell_size = 30
+        self.maze_photo = None
         
     def generate_maze(self):
         """Generate a new maze."""
@@ -207,28 +244,43 @@ class AIAgentGUI:
             (canvas_height - 20) // self.maze.height
         )
         
+        self.cell_size = max(2, self.cell_size)
+        
         # Clear canvas
         self.maze_canvas.delete("all")
         
+        # All cells are pixels of one image on the canvas, so coloring a cell
+        # later is a single PhotoImage.put instead of a new canvas item
+        width = self.maze.width * self.cell_size + 1
+        height = self.maze.height * self.cell_size + 1
+        self.maze_photo = tk.PhotoImage(width=width, height=height)
+        self.maze_photo.put("gray", to=(0, 0, width, height))
+        self.maze_canvas.create_image(10, 10, anchor=tk.NW, image=self.maze_photo)
+        
         # Draw cells
+        colors = {'#': "black", 'S': "green", 'G': "red"}
         for y in range(self.maze.height):
             for x in range(self.maze.width):
-                x1 = 10 + x * self.cell_size
-                y1 = 10 + y * self.cell_size
-                x2 = x1 + self.cell_size
-                y2 = y1 + self.cell_size
-                
                 cell = self.maze.grid[y][x]
-                if cell == '#':
-                    self.maze_canvas.create_rectangle(x1, y1, x2, y2, fill="black", outline="gray")
-                elif cell == 'S':
-                    self.maze_canvas.create_rectangle(x1, y1, x2, y2, fill="green", outline="gray")
-                    self.maze_canvas.create_text(x1 + self.cell_size//2, y1 + self.cell_size//2, text="S")
-                elif cell == 'G':
-                    self.maze_canvas.create_rectangle(x1, y1, x2, y2, fill="red", outline="gray")
-                    self.maze_canvas.create_text(x1 + self.cell_size//2, y1 + self.cell_size//2, text="G")
-                else:
-                    self.maze_canvas.create_rectangle(x1, y1, x2, y2, fill="white", outline="gray")
+                self.fill_maze_cell(x, y, colors.get(cell, "white"))
+                
+                if cell in ('S', 'G'):
+                    x1 = 10 + x * self.cell_size
+                    y1 = 10 + y * self.cell_size
+                    self.maze_canvas.create_text(x1 + self.cell_size//2, y1 + self.cell_size//2, text=cell)
+    
+    def fill_maze_cell(self, x, y, color):
+        """
+        Fill the inside of a maze cell in the maze image, keeping its gray border.
+        
+        Args:
+            x (int): The x-coordinate
+            y (int): The y-coordinate
+            color (str): The fill color
+        """
+        x1 = x * self.cell_size + 1
+        y1 = y * self.cell_size + 1
+        self.maze_photo.put(color, to=(x1, y1, x1 + self.cell_size - 1, y1 + self.cell_size - 1))
     
     def start_miu_search(self):
         """Start the MIU search."""
@@ -247,6 +299,7 @@ class AIAgentGUI:
         max_iterations = self.max_iterations_var.get()
         
         # Clear previous output
+        self.setup_miu_graph()
         self.output_text.delete(1.0, tk.END)
         self.graph = nx.DiGraph()
         self.ax.clear()
@@ -255,24 +308,28 @@ class AIAgentGUI:
         # Create the problem
         problem = MIUProblem(initial_state, goal_state)
         
+        self.output_text.insert(tk.END, f"Starting {algorithm} search...\n")
+        self.output_text.insert(tk.END, f"Initial state: {problem.initial_state}\n")
+        self.output_text.insert(tk.END, f"Goal state: {problem.goal}\n\n")
+        
         # Start search in a separate thread
         self.search_running = True
         threading.Thread(target=self.run_miu_search, args=(problem, algorithm, max_iterations)).start()
+        self.root.after(0, self.poll_search)
     
     def run_miu_search(self, problem, algorithm, max_iterations):
         """
         Run the MIU search algorithm.
         
+        This runs on a worker thread, so it never touches Tk or Matplotlib;
+        the search result is handed to the GUI thread through the event queue.
+        
         Args:
             problem (MIUProblem): The MIU problem
             algorithm (str): The search algorithm to use
             max_iterations (int): Maximum number of iterations
         """
         try:
-            self.output_text.insert(tk.END, f"Starting {algorithm} search...\n")
-            self.output_text.insert(tk.END, f"Initial state: {problem.initial_state}\n")
-            self.output_text.insert(tk.END, f"Goal state: {problem.goal}\n\n")
-            
             # Run the search algorithm
             if algorithm == "BFS":
                 solution, visited_nodes, iterations = breadth_first_search(problem, max_iterations)
@@ -281,73 +338,253 @@ class AIAgentGUI:
             elif algorithm == "A*":
                 solution, visited_nodes, iterations = a_star_search(problem, miu_heuristic, max_iterations)
             
-            # Visualize the search process
-            self.visualize_miu_search(visited_nodes, solution)
+            self.post_event("miu_result", solution, visited_nodes, iterations)
             
+        except Exception as e:
+            self.post_event("text", f"Error: {str(e)}\n")
+    
+    def post_event(self, kind, *args):
+        """
+        Hand a search result to the GUI thread.
+        
+        Args:
+            kind (str): The event type, dispatched by poll_search
+            *args: Arguments for the event handler
+        """
+        self.events.put((kind, args))
+    
+    def poll_search(self):
+        """
+        Wait on the Tk main loop for the worker thread's result.
+        
+        A result starts its animation; text and errors are shown and end the
+        search.
+        """
+        try:
+            kind, args = self.events.get_nowait()
+        except queue.Empty:
+            self.root.after(EVENT_POLL_MS, self.poll_search)
+            return
+        
+        if kind == "text":
+            self.output_text.insert(tk.END, args[0])
+            self.finish_search()
+        elif kind == "error":
+            messagebox.showerror("Error", args[0])
+            self.finish_search()
+        elif kind == "miu_result":
+            self.tick(self.miu_animation(*args))
+        elif kind == "maze_result":
+            self.tick(self.maze_animation(*args))
+    
+    def tick(self, frames):
+        """
+        Draw the next frame of an animation and schedule the one after it.
+        
+        Args:
+            frames (generator): Draws one frame per step and yields the delay
+                in milliseconds before the next one
+        """
+        if self.stop_requested:
+            frames.close()
+            self.finish_search()
+            return
+        
+        try:
+            delay = next(frames)
+        except StopIteration:
+            self.finish_search()
+            return
+        self.root.after(delay, self.tick, frames)
+    
+    def finish_search(self):
+        """Mark the current search as finished."""
+        self.search_running = False
+        self.stop_requested = False
+    
+    def miu_animation(self, solution, visited_nodes, iterations):
+        """
+        Animate an MIU search, one visited node per frame.
+        
+        The result text is written when the animation ends, also when it is
+        stopped early.
+        
+        Args:
+            solution (Node): The solution node, or None if no solution was found
+            visited_nodes (list): The nodes visited by the search
+            iterations (int): Number of iterations the search took
+        
+        Yields:
+            int: Delay in milliseconds before the next frame
+        """
+        try:
+            self.begin_miu_visualization(len(visited_nodes), solution)
+            for node in visited_nodes:
+                if node.parent:
+                    self.render_miu_node(node)
+                    
+                    # Adjust visualization speed
+                    yield int(1000 / self.speed_var.get())
+            self.finish_miu_visualization()
+        finally:
             # Display results
             if solution:
                 self.output_text.insert(tk.END, f"Solution found in {iterations} iterations!\n")
                 self.output_text.insert(tk.END, "Path:\n")
                 
-                path = solution.path()
-                for i, node in enumerate(path):
+                for i, node in enumerate(solution.path()):
                     if i > 0:
                         self.output_text.insert(tk.END, f"  {i}. {node.action} -> {node.state}\n")
                     else:
                         self.output_text.insert(tk.END, f"  {i}. Start: {node.state}\n")
             else:
                 self.output_text.insert(tk.END, f"No solution found after {iterations} iterations.\n")
-            
-        except Exception as e:
-            self.output_text.insert(tk.END, f"Error: {str(e)}\n")
-        finally:
-            self.search_running = False
     
-    def visualize_miu_search(self, visited_nodes, solution):
+    def seed_position(self, state, parent_state):
         """
-        Visualize the MIU search process.
+        Place a new node next to its parent until the next layout update.
         
         Args:
-            visited_nodes (list): List of visited nodes
+            state (str): The new node
+            parent_state (str): The node it was generated from
+        """
+        if self.pos is None:
+            self.pos = {}
+        self.pos.setdefault(parent_state, (0.0, 0.0))
+        if state not in self.pos:
+            x, y = self.pos[parent_state]
+            self.pos[state] = (x + random.uniform(-0.05, 0.05), y + random.uniform(-0.05, 0.05))
+    
+    def update_layout(self):
+        """
+        Update the node positions after nodes were added to the graph.
+        
+        The previous positions seed a few spring iterations, so the layout is
+        refined instead of recomputed. Every spring iteration is quadratic in the
+        number of nodes, so past LAYERED_LAYOUT_NODES nodes the graph is laid out
+        in one row per search depth instead, which takes linear time.
+        """
+        n = len(self.graph)
+        if n > LAYERED_LAYOUT_NODES:
+            self.pos = nx.multipartite_layout(self.graph, subset_key="depth", align="horizontal")
+        else:
+            self.pos = nx.spring_layout(self.graph, pos=self.pos, iterations=3, k=1 / math.sqrt(n))
+    
+    def draw_miu_graph(self, path_states, path_edges):
+        """
+        Redraw the whole MIU graph and cache it as the blitting background.
+        
+        Args:
+            path_states (list): States on the solution path
+            path_edges (list): Edges on the solution path
+        """
+        self.ax.clear()
+        nx.draw(self.graph, self.pos, ax=self.ax, with_labels=True, 
+               node_color="lightblue", node_size=500, font_size=8,
+               edge_color="gray", arrows=True)
+        
+        # Highlight the part of the solution path that is drawn so far
+        if path_states:
+            nx.draw_networkx_nodes(self.graph, self.pos, ax=self.ax, node_color="green", node_size=500,
+                                 nodelist=[state for state in path_states if state in self.graph])
+            nx.draw_networkx_edges(self.graph, self.pos, edge_color="green", width=2, ax=self.ax,
+                                 edgelist=[edge for edge in path_edges if self.graph.has_edge(*edge)])
+        
+        self.canvas.draw()
+        self._bg = self.canvas.copy_from_bbox(self.ax.bbox)
+    
+    def draw_artists(self, artists):
+        """
+        Render artists returned by the networkx drawing functions.
+        
+        Args:
+            artists: An artist, or a list or dict of artists
+        """
+        if isinstance(artists, dict):
+            artists = artists.values()
+        elif not isinstance(artists, list):
+            artists = [artists]
+        for artist in artists:
+            self.ax.draw_artist(artist)
+    
+    def blit_miu_nodes(self, edges, path_states):
+        """
+        Add new nodes and their edges to the drawn graph without a full redraw.
+        
+        The nodes are drawn onto the cached background, which is then saved
+        again, and the newest node is highlighted on top of it.
+        
+        Args:
+            edges (list): (parent_state, state) pairs of the new nodes, oldest first
+            path_states (list): States on the solution path
+        """
+        self.canvas.restore_region(self._bg)
+        
+        states = [state for _, state in edges]
+        colors = ["green" if state in path_states else "lightblue" for state in states]
+        self.draw_artists(nx.draw_networkx_edges(self.graph, self.pos, edgelist=edges,
+                                                 edge_color="gray", arrows=True, ax=self.ax))
+        self.draw_artists(nx.draw_networkx_nodes(self.graph, self.pos, nodelist=states,
+                                                 node_color=colors, node_size=500, ax=self.ax))
+        self.draw_artists(nx.draw_networkx_labels(self.graph, self.pos, labels={state: state for state in states},
+                                                  font_size=8, ax=self.ax))
+        self._bg = self.canvas.copy_from_bbox(self.ax.bbox)
+        
+        # Highlight the current node
+        state = states[-1]
+        self.draw_artists(nx.draw_networkx_nodes(self.graph, self.pos, nodelist=[state],
+                                                 node_color="yellow", node_size=500, ax=self.ax))
+        self.canvas.blit(self.ax.bbox)
+        
+        # Only flush the redraw; a full update() would also run pending events
+        # from inside the animation tick
+        self.canvas.get_tk_widget().update_idletasks()
+    
+    def begin_miu_visualization(self, node_count, solution):
+        """
+        Prepare the MIU graph animation.
+        
+        Args:
+            node_count (int): Number of visited nodes that will be shown
             solution (Node): The solution node, or None if no solution was found
         """
-        # Build the graph
-        for node in visited_nodes:
-            if node.parent:
-                self.graph.add_edge(node.parent.state, node.state)
-                
-                # Update the graph visualization
-                if not self.search_running:
-                    break
-                    
-                self.ax.clear()
-                
-                # Use spring layout for small graphs, shell layout for larger ones
-                if len(self.graph) < 20:
-                    self.pos = nx.spring_layout(self.graph)
-                else:
-                    self.pos = nx.shell_layout(self.graph)
-                
-                nx.draw(self.graph, self.pos, ax=self.ax, with_labels=True, 
-                       node_color="lightblue", node_size=500, font_size=8,
-                       edge_color="gray", arrows=True)
-                
-                # Highlight the current node
-                nx.draw_networkx_nodes(self.graph, self.pos, nodelist=[node.state],
-                                     node_color="yellow", node_size=500, ax=self.ax)
-                
-                # Highlight the path if a solution is found
-                if solution:
-                    path_states = [n.state for n in solution.path()]
-                    path_edges = [(path_states[i], path_states[i+1]) for i in range(len(path_states)-1)]
-                    
-                    nx.draw_networkx_nodes(self.graph, self.pos, nodelist=path_states,
-                                         node_color="green", node_size=500, ax=self.ax)
-                    nx.draw_networkx_edges(self.graph, self.pos, edgelist=path_edges,
-                                         edge_color="green", width=2, ax=self.ax)
-                
-                self.canvas.draw()
-                time.sleep(1.0 / self.speed_var.get())  # Adjust visualization speed
+        self.path_states = [n.state for n in solution.path()] if solution else []
+        self.path_edges = [(self.path_states[i], self.path_states[i+1])
+                           for i in range(len(self.path_states)-1)]
+        
+        # Relayout and redraw the whole graph in batches, about 50 times per
+        # search; the nodes in between are blitted onto the last full drawing
+        self.batch_size = max(1, node_count // 50)
+        self.pos = None
+        self._bg = None
+        self.added_nodes = 0
+        self.next_layout = 0
+    
+    def render_miu_node(self, node):
+        """
+        Add one visited node to the MIU graph animation.
+        
+        Args:
+            node (Node): The visited node
+        """
+        self.graph.add_edge(node.parent.state, node.state)
+        self.graph.nodes[node.parent.state].setdefault("depth", node.depth - 1)
+        self.graph.nodes[node.state].setdefault("depth", node.depth)
+        self.seed_position(node.state, node.parent.state)
+        self.added_nodes += 1
+        
+        if self._bg is None or self.added_nodes >= self.next_layout:
+            self.update_layout()
+            self.draw_miu_graph(self.path_states, self.path_edges)
+            self.next_layout = self.added_nodes + self.batch_size
+        else:
+            self.blit_miu_nodes([(node.parent.state, node.state)], self.path_states)
+    
+    def finish_miu_visualization(self):
+        """Finish the MIU graph animation with a full drawing of the final layout."""
+        if self._bg is not None:
+            self.update_layout()
+            self.draw_miu_graph(self.path_states, self.path_edges)
     
     def start_maze_search(self):
         """Start the maze search."""
@@ -367,11 +604,15 @@ class AIAgentGUI:
         # Start search in a separate thread
         self.search_running = True
         threading.Thread(target=self.run_maze_search, args=(problem, algorithm)).start()
+        self.root.after(0, self.poll_search)
     
     def run_maze_search(self, problem, algorithm):
         """
         Run the maze search algorithm.
         
+        This runs on a worker thread and hands the search result to the GUI
+        thread through the event queue.
+        
         Args:
             problem (MazeProblem): The maze problem
             algorithm (str): The search algorithm to use
@@ -385,66 +626,51 @@ class AIAgentGUI:
             elif algorithm == "A*":
                 solution, visited_nodes, iterations = a_star_search(problem, manhattan_distance)
             
-            # Visualize the search process
-            self.visualize_maze_search(visited_nodes, solution)
+            self.post_event("maze_result", solution, visited_nodes)
             
         except Exception as e:
-            messagebox.showerror("Error", f"Search error: {str(e)}")
-        finally:
-            self.search_running = False
+            self.post_event("error", f"Search error: {str(e)}")
     
-    def visualize_maze_search(self, visited_nodes, solution):
+    def maze_animation(self, solution, visited_nodes):
         """
-        Visualize the maze search process.
+        Animate a maze search, one cell per frame.
         
         Args:
-            visited_nodes (list): List of visited nodes
             solution (Node): The solution node, or None if no solution was found
+            visited_nodes (list): The nodes visited by the search
+        
+        Yields:
+            int: Delay in milliseconds before the next frame
         """
-        # Redraw the maze
         self.draw_maze()
-        
-        # Visualize the search process
         for node in visited_nodes:
-            if not self.search_running:
-                break
-                
             if node.parent:
-                x, y = node.state
-                x1 = 10 + x * self.cell_size
-                y1 = 10 + y * self.cell_size
-                x2 = x1 + self.cell_size
-                y2 = y1 + self.cell_size
-                
-                # Draw visited cell
-                if self.maze.grid[y][x] not in ['S', 'G']:
-                    self.maze_canvas.create_rectangle(x1, y1, x2, y2, fill="lightblue", outline="gray")
-                
-                self.root.update()
-                time.sleep(0.5 / self.maze_speed_var.get())  # Adjust visualization speed
+                self.draw_maze_cell(node.state, "lightblue")
+                yield int(500 / self.maze_speed_var.get())
         
         # Draw the solution path if found
         if solution:
-            path = solution.path()
-            for node in path:
-                if not self.search_running:
-                    break
-                    
-                x, y = node.state
-                if self.maze.grid[y][x] not in ['S', 'G']:
-                    x1 = 10 + x * self.cell_size
-                    y1 = 10 + y * self.cell_size
-                    x2 = x1 + self.cell_size
-                    y2 = y1 + self.cell_size
-                    
-                    self.maze_canvas.create_rectangle(x1, y1, x2, y2, fill="yellow", outline="gray")
-                
-                self.root.update()
-                time.sleep(0.5 / self.maze_speed_var.get())
+            for node in solution.path():
+                self.draw_maze_cell(node.state, "yellow")
+                yield int(500 / self.maze_speed_var.get())
+    
+    def draw_maze_cell(self, state, color):
+        """
+        Color a maze cell, leaving the start and goal cells as they are.
+        
+        Args:
+            state (tuple): The cell position (x, y)
+            color (str): The fill color
+        """
+        x, y = state
+        if self.maze.grid[y][x] not in ['S', 'G']:
+            self.fill_maze_cell(x, y, color)
     
     def stop_search(self):
         """Stop the current search."""
-        self.search_running = False
+        # The search thread finishes on its own; its animation is dropped
+        if self.search_running:
+            self.stop_requested = True
 
 
 def main():
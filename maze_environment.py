@@ -4,9 +4,21 @@ Maze Environment Module
 This module implements a maze environment for the AI agent.
 """
 
-import random
+import numpy as np
 from search import Problem
 
+try:
+    from search_numba import grid_neighbors, neighbor_table
+except ImportError:
+    # Numba is optional, the NumPy versions below are used without it
+    grid_neighbors = neighbor_table = None
+
+# Neighbor offsets and their actions, in the order of Maze.get_neighbors
+_MOVES = [((0, 1), "Down"), ((1, 0), "Right"), ((0, -1), "Up"), ((-1, 0), "Left")]
+_DELTAS = tuple(delta for delta, _ in _MOVES)
+_ACTIONS = [action for _, action in _MOVES]
+_OPPOSITE = {action: _ACTIONS[(k + 2) % 4] for k, action in enumerate(_ACTIONS)}
+
 class Maze:
     """A maze environment."""
     
@@ -20,25 +32,48 @@ class Maze:
             wall_probability (float): The probability of a cell being a wall
             seed (int): Random seed for reproducibility
         """
-        if seed is not None:
-            random.seed(seed)
+        rng = np.random.default_rng(seed)
         
         self.width = width
         self.height = height
-        self.grid = [[' ' for _ in range(width)] for _ in range(height)]
         
-        # Generate random walls
-        for y in range(height):
-            for x in range(width):
-                if random.random() < wall_probability:
-                    self.grid[y][x] = '#'
+        # Generate random walls as one mask, stored as a contiguous uint8
+        # array (1 for a wall) so a cell test is a single memory load
+        self.walls = (rng.random((height, width)) < wall_probability).astype(np.uint8)
         
         # Ensure start and goal are not walls
         self.start = (0, 0)
         self.goal = (width - 1, height - 1)
+        self.walls[self.start[1], self.start[0]] = 0
+        self.walls[self.goal[1], self.goal[0]] = 0
+        
+        # Character grid for display and JSON; searches only use self.walls
+        self.grid = np.where(self.walls, '#', ' ').tolist()
         self.grid[self.start[1]][self.start[0]] = 'S'
         self.grid[self.goal[1]][self.goal[0]] = 'G'
     
+    @classmethod
+    def from_grid(cls, grid, start=None, goal=None):
+        """
+        Create a maze from an existing character grid.
+        
+        Args:
+            grid (list): Rows of cells, with '#' marking walls
+            start (tuple): The start position (x, y), defaults to the top-left cell
+            goal (tuple): The goal position (x, y), defaults to the bottom-right cell
+            
+        Returns:
+            Maze: The maze
+        """
+        maze = cls.__new__(cls)
+        maze.height = len(grid)
+        maze.width = len(grid[0]) if maze.height > 0 else 0
+        maze.grid = [list(row) for row in grid]
+        maze.walls = (np.array(maze.grid).reshape(maze.height, maze.width) == '#').astype(np.uint8)
+        maze.start = tuple(start) if start is not None else (0, 0)
+        maze.goal = tuple(goal) if goal is not None else (maze.width - 1, maze.height - 1)
+        return maze
+    
     def is_valid_position(self, x, y):
         """
         Check if a position is valid (within bounds and not a wall).
@@ -52,7 +87,7 @@ class Maze:
         """
         return (0 <= x < self.width and 
                 0 <= y < self.height and 
-                self.grid[y][x] != '#')
+                self.walls[y, x] == 0)
     
     def get_neighbors(self, x, y):
         """
@@ -65,12 +100,13 @@ class Maze:
         Returns:
             list: A list of valid neighboring positions (x, y)
         """
-        neighbors = []
-        for dx, dy in [(0, 1), (1, 0), (0, -1), (-1, 0)]:  # Down, Right, Up, Left
-            nx, ny = x + dx, y + dy
-            if self.is_valid_position(nx, ny):
-                neighbors.append((nx, ny))
-        return neighbors
+        if grid_neighbors is not None:
+            return [tuple(c) for c in grid_neighbors(x, y, self.walls).tolist()]
+        
+        # Small per-call arrays cost more than they save, so this is plain Python
+        width, height, walls = self.width, self.height, self.walls
+        return [(nx, ny) for nx, ny in ((x + dx, y + dy) for dx, dy in _DELTAS)
+                if 0 <= nx < width and 0 <= ny < height and walls[ny, nx] == 0]
     
     def __str__(self):
         """Return a string representation of the maze."""
@@ -89,6 +125,37 @@ class MazeProblem(Problem):
         """
         super().__init__(maze.start, maze.goal)
         self.maze = maze
+        
+        # The maze does not change during a search, so the neighbors of every
+        # cell are looked up once and shared by all searches on this problem
+        self.adj = self._build_adjacency()
+        # (action, state) lists are built from adj the first time a cell is expanded
+        self._successors = [None] * len(self.adj)
+    
+    def _build_adjacency(self):
+        """
+        Compute the neighbor table of the maze.
+        
+        Returns:
+            numpy.ndarray: An int32 array of shape (height * width, 4) holding, for
+                every cell y * width + x, the index of its Down, Right, Up and Left
+                neighbors, or -1 where the move is blocked
+        """
+        if neighbor_table is not None:
+            return neighbor_table(self.maze.walls)
+        
+        width, height = self.maze.width, self.maze.height
+        open_cells = self.maze.walls == 0
+        ys, xs = np.indices((height, width))
+        
+        adj = np.full((height * width, 4), -1, np.int32)
+        for k, ((dx, dy), _) in enumerate(_MOVES):
+            nx, ny = xs + dx, ys + dy
+            inside = (nx >= 0) & (nx < width) & (ny >= 0) & (ny < height)
+            valid = inside.copy()
+            valid[inside] = open_cells[ny[inside], nx[inside]]
+            adj[:, k] = np.where(valid, ny * width + nx, -1).reshape(-1)
+        return adj
     
     def get_successors(self, state):
         """
@@ -98,25 +165,34 @@ class MazeProblem(Problem):
             state (tuple): The current position (x, y)
             
         Returns:
-            list: A list of (action, state) pairs
+            list: A list of (action, state) pairs, shared between calls and not
+                to be modified
         """
         x, y = state
-        successors = []
-        
-        for nx, ny in self.maze.get_neighbors(x, y):
-            if (nx, ny) == (x + 1, y):
-                action = "Right"
-            elif (nx, ny) == (x - 1, y):
-                action = "Left"
-            elif (nx, ny) == (x, y + 1):
-                action = "Down"
-            else:  # (nx, ny) == (x, y - 1)
-                action = "Up"
-            
-            successors.append((action, (nx, ny)))
-        
+        width = self.maze.width
+        cell = y * width + x
+        successors = self._successors[cell]
+        if successors is None:
+            successors = [(action, (j % width, j // width))
+                          for action, j in zip(_ACTIONS, self.adj[cell].tolist()) if j >= 0]
+            self._successors[cell] = successors
         return successors
     
+    def get_predecessors(self, state):
+        """
+        Return a list of (action, state) pairs from which the given state is reachable.
+        
+        Moves are reversible, so these are the successors with each action
+        turned around.
+        
+        Args:
+            state (tuple): The current position (x, y)
+            
+        Returns:
+            list: A list of (action, state) pairs
+        """
+        return [(_OPPOSITE[action], neighbor) for action, neighbor in self.get_successors(state)]
+    
     def is_goal(self, state):
         """
         Return True if the state is the goal state.
@@ -0,0 +1,180 @@
+"""
+MIU Bits Module
+
+This module implements the MIU rules over bit-packed strings. Each symbol is
+stored in 2 bits (M=0, I=1, U=2), least significant symbol first, so a string
+is the pair (length, word) with word a plain Python int. Strings up to 32
+symbols fit in a single machine word, and the rules become shifts and masks
+over the whole string instead of character-by-character slicing.
+"""
+
+# Symbol codes used in the packed words
+M, I, U = 0, 1, 2
+
+_CODES = {"M": M, "I": I, "U": U}
+_SYMBOLS = "MIU"
+
+
+def pack(s):
+    """
+    Convert an MIU string into its packed form.
+
+    Args:
+        s (str): A string of M, I, and U characters
+
+    Returns:
+        tuple: (length, word) for the string
+    """
+    word = 0
+    for i, c in enumerate(s):
+        word |= _CODES[c] << (2 * i)
+    return len(s), word
+
+
+def unpack(length, word):
+    """
+    Convert a packed string back into an MIU string.
+
+    Args:
+        length (int): Number of symbols in the string
+        word (int): The packed symbols
+
+    Returns:
+        str: The MIU string
+    """
+    return "".join(_SYMBOLS[(word >> (2 * i)) & 3] for i in range(length))
+
+
+def _low_bits(length):
+    """Return a mask with the low bit of each of the first length symbols set."""
+    return ((1 << (2 * length)) - 1) // 3
+
+
+def _symbol_bits(length, word, symbol):
+    """
+    Mark the positions holding a given symbol.
+
+    Args:
+        length (int): Number of symbols in the string
+        word (int): The packed symbols
+        symbol (int): The symbol code to look for (I or U)
+
+    Returns:
+        int: A word with bit 2*i set exactly when symbol i equals symbol
+    """
+    low = _low_bits(length)
+    if symbol == I:
+        return word & ~(word >> 1) & low
+    return (word >> 1) & ~word & low
+
+
+def _positions(candidates):
+    """Yield the symbol index of every set bit, lowest first."""
+    while candidates:
+        lowest = candidates & -candidates
+        yield (lowest.bit_length() - 1) >> 1
+        candidates ^= lowest
+
+
+def apply_rules_packed(length, word):
+    """
+    Apply every MIU rule at every position of a packed string.
+
+    Args:
+        length (int): Number of symbols in the string
+        word (int): The packed symbols
+
+    Returns:
+        list: (rule, position, length, word) tuples in rule order, where
+            position is the match position for rules 3 and 4 and None otherwise;
+            the same child can appear more than once
+    """
+    results = []
+
+    # Rule 1: If string ends with 'I', append 'U'
+    if length > 0 and (word >> (2 * (length - 1))) & 3 == I:
+        results.append((1, None, length + 1, word | (U << (2 * length))))
+
+    # Rule 2: If string starts with 'M', duplicate everything after 'M'
+    if length > 0 and word & 3 == M:
+        results.append((2, None, 2 * length - 1, word | ((word >> 2) << (2 * length))))
+
+    # Rule 3: Replace "III" with "U"
+    is_i = _symbol_bits(length, word, I)
+    for i in _positions(is_i & (is_i >> 2) & (is_i >> 4)):
+        low = word & ((1 << (2 * i)) - 1)
+        high = word >> (2 * (i + 3))
+        results.append((3, i, length - 2, low | (U << (2 * i)) | (high << (2 * (i + 1)))))
+
+    # Rule 4: Remove "UU"
+    is_u = _symbol_bits(length, word, U)
+    for i in _positions(is_u & (is_u >> 2)):
+        low = word & ((1 << (2 * i)) - 1)
+        high = word >> (2 * (i + 2))
+        results.append((4, i, length - 2, low | (high << (2 * i))))
+
+    return results
+
+
+def next_states_packed(length, word):
+    """
+    Generate all possible next states of a packed string.
+
+    The states come in the same order as miu_system.next_states.
+
+    Args:
+        length (int): Number of symbols in the string
+        word (int): The packed symbols
+
+    Returns:
+        list: A list of (length, word) pairs, with duplicates removed
+    """
+    # Remove duplicates while preserving order
+    return list(dict.fromkeys((n, w) for _, _, n, w in apply_rules_packed(length, word)))
+
+
+def symbol_counts(length, word):
+    """
+    Count the symbols of a packed string.
+
+    Args:
+        length (int): Number of symbols in the string
+        word (int): The packed symbols
+
+    Returns:
+        tuple: The number of 'M', 'I' and 'U' symbols
+    """
+    i = bin(_symbol_bits(length, word, I)).count("1")
+    u = bin(_symbol_bits(length, word, U)).count("1")
+    return length - i - u, i, u
+
+
+def to_key(length, word):
+    """
+    Combine a packed string into a single int.
+
+    A marker bit just above the last symbol keeps the length, so strings that
+    differ only in trailing 'M's still get different keys.
+
+    Args:
+        length (int): Number of symbols in the string
+        word (int): The packed symbols
+
+    Returns:
+        int: The key
+    """
+    return word | (1 << (2 * length))
+
+
+def from_key(key):
+    """
+    Split a key made by to_key back into a packed string.
+
+    Args:
+        key (int): The key
+
+    Returns:
+        tuple: (length, word) for the string
+    """
+    length = (key.bit_length() - 1) >> 1
+    return length, key ^ (1 << (2 * length))
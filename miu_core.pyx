@@ -0,0 +1,100 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""
+MIU Core Module
+
+This module implements the MIU system's next_states function as a compiled
+Cython extension. Strings are passed as ASCII bytes, scanned once through a
+typed char pointer, and every child is built with memcpy straight into a new
+bytes object.
+
+Build it in place with: python setup.py build_ext --inplace
+"""
+
+from cpython.bytes cimport PyBytes_AsString, PyBytes_AsStringAndSize, PyBytes_FromStringAndSize
+from libc.string cimport memcpy
+
+
+cdef inline bytes _new_bytes(Py_ssize_t n, char **out):
+    """Allocate an uninitialized bytes object of length n and expose its buffer."""
+    cdef bytes b = PyBytes_FromStringAndSize(NULL, n)
+    out[0] = PyBytes_AsString(b)
+    return b
+
+
+cdef inline void _add(list results, set seen, bytes new_s):
+    """Append new_s to results unless it was generated before."""
+    if new_s not in seen:
+        seen.add(new_s)
+        results.append(new_s)
+
+
+cdef list next_states_c(const char *p, Py_ssize_t n):
+    """
+    Apply the MIU rules to an ASCII buffer of length n.
+
+    Rule 3 and rule 4 matches are collected in one pass over the buffer and
+    then emitted in rule order, so the results match miu_system.next_states.
+    """
+    cdef list results = []
+    cdef set seen = set()
+    cdef list rule3 = [], rule4 = []
+    cdef Py_ssize_t i
+    cdef char *q
+    cdef bytes new_s
+
+    # Find every "III" and "UU" in a single scan
+    for i in range(n - 1):
+        if p[i] == b'U':
+            if p[i + 1] == b'U':
+                rule4.append(i)
+        elif p[i] == b'I' and i + 2 < n and p[i + 1] == b'I' and p[i + 2] == b'I':
+            rule3.append(i)
+
+    # Rule 1: If string ends with 'I', append 'U'
+    if n > 0 and p[n - 1] == b'I':
+        new_s = _new_bytes(n + 1, &q)
+        memcpy(q, p, n)
+        q[n] = b'U'
+        _add(results, seen, new_s)
+
+    # Rule 2: If string starts with 'M', duplicate everything after 'M'
+    if n > 0 and p[0] == b'M':
+        new_s = _new_bytes(2 * n - 1, &q)
+        memcpy(q, p, n)
+        memcpy(q + n, p + 1, n - 1)
+        _add(results, seen, new_s)
+
+    # Rule 3: Replace "III" with "U"
+    for i in rule3:
+        new_s = _new_bytes(n - 2, &q)
+        memcpy(q, p, i)
+        q[i] = b'U'
+        memcpy(q + i + 1, p + i + 3, n - i - 3)
+        _add(results, seen, new_s)
+
+    # Rule 4: Remove "UU"
+    for i in rule4:
+        new_s = _new_bytes(n - 2, &q)
+        memcpy(q, p, i)
+        memcpy(q + i, p + i + 2, n - i - 2)
+        _add(results, seen, new_s)
+
+    return results
+
+
+cpdef list next_states(bytes s):
+    """
+    Generate all possible next states by applying the MIU system rules.
+
+    Returns the same states in the same order as miu_system.next_states.
+
+    Args:
+        s (bytes): The current state as ASCII bytes
+
+    Returns:
+        list: A list of all possible next states as bytes, with duplicates removed
+    """
+    cdef char *p
+    cdef Py_ssize_t n
+    PyBytes_AsStringAndSize(s, &p, &n)
+    return next_states_c(p, n)
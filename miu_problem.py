@@ -4,25 +4,42 @@ MIU Problem Module
 This module defines the MIU problem as a search problem.
 """
 
+import functools
+
+import miu_bits
+from miu_system import all_positions, miu_symbols
 from search import Problem
-from miu_system import next_states
 
 class MIUProblem(Problem):
     """
     The MIU problem as a search problem.
     
     The MIU problem involves transforming strings according to the MIU system rules.
+    States are str, or ASCII bytes if the initial state and the goal are given
+    as bytes; bytes states take less memory and feed the compiled miu_core
+    rules without encoding.
     """
     
-    def __init__(self, initial_state, goal):
+    def __init__(self, initial_state, goal, use_invariants=True, max_length=None):
         """
         Initialize the MIU problem.
         
         Args:
-            initial_state (str): The initial MIU string
-            goal (str): The goal MIU string
+            initial_state (str or bytes): The initial MIU string
+            goal (str or bytes): The goal MIU string, of the same type
+            use_invariants (bool): If True, a goal that goal_reachable rules out
+                gets no successors or predecessors, so every search gives up
+                after its first expansion
+            max_length (int): If given, states longer than this are pruned.
+                Shortest derivations may need longer intermediate strings, so
+                this can hide solutions and is off by default
         """
         super().__init__(initial_state, goal)
+        self.symbols = miu_symbols(initial_state)
+        # The goal is fixed, so its character counts are computed only once
+        self.goal_counts = goal_counts(goal) if goal else None
+        self.max_length = max_length
+        self.goal_reachable = not (use_invariants and goal) or goal_reachable(initial_state, goal)
     
     def get_successors(self, state):
         """
@@ -34,42 +51,78 @@ class MIUProblem(Problem):
         Returns:
             list: A list of (action, state) pairs
         """
+        if not self.goal_reachable:
+            return []
+        
+        M, I, U, III, UU = self.symbols
+        
+        # Every candidate below is produced by an MIU rule, so it is a next
+        # state by construction and needs no check against next_states
         successors = []
-        next_states_list = next_states(state)
         
         # Rule 1: If string ends with 'I', append 'U'
-        if state.endswith("I"):
-            new_state = state + "U"
-            if new_state in next_states_list:
-                successors.append(("Rule 1: Append U", new_state))
+        if state.endswith(I):
+            new_state = state + U
+            successors.append(("Rule 1: Append U", new_state))
         
         # Rule 2: If string starts with 'M', duplicate everything after 'M'
-        if state.startswith("M"):
-            suffix = state[1:]
-            new_state = "M" + suffix + suffix
-            if new_state in next_states_list:
-                successors.append(("Rule 2: Duplicate after M", new_state))
+        if state.startswith(M):
+            new_state = state + state[1:]
+            successors.append(("Rule 2: Duplicate after M", new_state))
         
         # Rule 3: Replace "III" with "U"
-        idx = 0
-        while "III" in state[idx:]:
-            i = state.index("III", idx)
-            new_state = state[:i] + "U" + state[i+3:]
-            if new_state in next_states_list:
-                successors.append((f"Rule 3: Replace III with U at position {i}", new_state))
-            idx = i + 1
+        for i in all_positions(state, III):
+            new_state = state[:i] + U + state[i+3:]
+            successors.append((f"Rule 3: Replace III with U at position {i}", new_state))
         
         # Rule 4: Remove "UU"
-        idx = 0
-        while "UU" in state[idx:]:
-            i = state.index("UU", idx)
+        for i in all_positions(state, UU):
             new_state = state[:i] + state[i+2:]
-            if new_state in next_states_list:
-                successors.append((f"Rule 4: Remove UU at position {i}", new_state))
-            idx = i + 1
+            successors.append((f"Rule 4: Remove UU at position {i}", new_state))
         
+        if self.max_length is not None:
+            return [(action, s) for action, s in successors if len(s) <= self.max_length]
         return successors
     
+    def get_predecessors(self, state):
+        """
+        Return a list of (action, state) pairs from which the given state is reachable.
+        
+        Each rule is run backwards; the actions are named as in get_successors.
+        
+        Args:
+            state (str): The current MIU string
+            
+        Returns:
+            list: A list of (action, state) pairs
+        """
+        if not self.goal_reachable:
+            return []
+        
+        M, I, U, III, UU = self.symbols
+        predecessors = []
+        
+        # Rule 1: The state ends with a 'U' appended after an 'I'
+        if state.endswith(I + U):
+            predecessors.append(("Rule 1: Append U", state[:-1]))
+        
+        # Rule 2: Everything after 'M' is the same string twice
+        half, odd = divmod(len(state) - 1, 2)
+        if state.startswith(M) and half > 0 and not odd and state[1:half+1] == state[half+1:]:
+            predecessors.append(("Rule 2: Duplicate after M", state[:half+1]))
+        
+        # Rule 3: Every 'U' can have been "III"
+        for i in all_positions(state, U):
+            predecessors.append((f"Rule 3: Replace III with U at position {i}", state[:i] + III + state[i+1:]))
+        
+        # Rule 4: "UU" can have been removed after any character
+        for i in range(1, len(state) + 1):
+            predecessors.append((f"Rule 4: Remove UU at position {i}", state[:i] + UU + state[i:]))
+        
+        if self.max_length is not None:
+            return [(action, s) for action, s in predecessors if len(s) <= self.max_length]
+        return predecessors
+    
     def is_goal(self, state):
         """
         Return True if the state is the goal state.
@@ -98,6 +151,176 @@ class MIUProblem(Problem):
         return 1
 
 
+class PackedMIUProblem(Problem):
+    """
+    The MIU problem with states stored as packed ints.
+    
+    Every state is a miu_bits key (2 bits per symbol plus a length marker),
+    so the frontier and explored sets hash and compare plain ints instead of
+    strings. Use encode and decode to convert states to and from MIU strings,
+    e.g. for display, and packed_miu_heuristic for A*.
+    """
+    
+    _RULE_ACTIONS = {
+        1: "Rule 1: Append U",
+        2: "Rule 2: Duplicate after M",
+        3: "Rule 3: Replace III with U at position {}",
+        4: "Rule 4: Remove UU at position {}",
+    }
+    
+    def __init__(self, initial_state, goal):
+        """
+        Initialize the packed MIU problem.
+        
+        Args:
+            initial_state (str): The initial MIU string
+            goal (str): The goal MIU string
+        """
+        super().__init__(self.encode(initial_state), self.encode(goal))
+    
+    @staticmethod
+    def encode(s):
+        """
+        Convert an MIU string into a packed state.
+        
+        Args:
+            s (str): The MIU string
+            
+        Returns:
+            int: The packed state
+        """
+        return miu_bits.to_key(*miu_bits.pack(s))
+    
+    @staticmethod
+    def decode(state):
+        """
+        Convert a packed state back into an MIU string.
+        
+        Args:
+            state (int): The packed state
+            
+        Returns:
+            str: The MIU string
+        """
+        return miu_bits.unpack(*miu_bits.from_key(state))
+    
+    def get_successors(self, state):
+        """
+        Return a list of (action, state) pairs reachable from the given state.
+        
+        The actions and their order match MIUProblem.get_successors.
+        
+        Args:
+            state (int): The current packed state
+            
+        Returns:
+            list: A list of (action, state) pairs
+        """
+        return [(self._RULE_ACTIONS[rule].format(position), miu_bits.to_key(length, word))
+                for rule, position, length, word in miu_bits.apply_rules_packed(*miu_bits.from_key(state))]
+    
+    def is_goal(self, state):
+        """
+        Return True if the state is the goal state.
+        
+        Args:
+            state (int): The state to check
+            
+        Returns:
+            bool: True if the state is the goal state
+        """
+        return state == self.goal
+    
+    def get_cost(self, state, action, next_state):
+        """
+        Return the cost of taking action from state to reach next_state.
+        
+        Args:
+            state (int): The current state
+            action (str): The action to take
+            next_state (int): The resulting state
+            
+        Returns:
+            int: The cost of the action
+        """
+        return 1
+
+
+def goal_reachable(initial_state, goal):
+    """
+    Check the MIU invariants that every derivation from a string preserves.
+    
+    Rule 2 doubles the number of 'I's and rule 3 removes three of them, so
+    whether that number is a multiple of 3 never changes; this is why MU
+    cannot be derived from MI. Rule 2 also doubles the number of 'M's after
+    the first character, which no other rule touches, and no rule removes
+    a leading 'M'. A string that does not start with 'M' can still come to
+    start with one, when rule 4 removes the 'UU' in front of it.
+    
+    Args:
+        initial_state (str or bytes): The initial MIU string
+        goal (str or bytes): The goal MIU string, of the same type
+        
+    Returns:
+        bool: False if the goal can never be derived, True if these
+            invariants do not rule it out
+    """
+    if initial_state == goal:
+        return True
+    M = miu_symbols(initial_state)[0]
+    if initial_state.startswith(M) and not goal.startswith(M):
+        return False
+    
+    m, i, _ = char_counts(initial_state)
+    goal_m, goal_i, _ = goal_counts(goal)
+    
+    if (i % 3 == 0) != (goal_i % 3 == 0):
+        return False
+    
+    if initial_state.startswith(M):
+        # The number of later 'M's must be the initial one times a power of 2
+        extra, goal_extra = m - 1, goal_m - 1
+        if extra == 0:
+            return goal_extra == 0
+        ratio, rest = divmod(goal_extra, extra)
+        return rest == 0 and ratio > 0 and ratio & (ratio - 1) == 0
+    
+    return True
+
+
+def char_counts(s):
+    """
+    Count the characters of an MIU string.
+    
+    Only 'I' and 'U' are counted, each by one C-level scan; every other
+    character of a valid MIU string is an 'M'.
+    
+    Args:
+        s (str or bytes): An MIU string
+        
+    Returns:
+        tuple: The number of 'M', 'I' and 'U' characters
+    """
+    _, I, U, _, _ = miu_symbols(s)
+    i = s.count(I)
+    u = s.count(U)
+    return len(s) - i - u, i, u
+
+
+@functools.lru_cache(maxsize=128)
+def goal_counts(goal):
+    """
+    Count the characters of a goal string, cached per goal.
+    
+    Args:
+        goal (str or bytes): The goal state
+        
+    Returns:
+        tuple: The number of 'M', 'I' and 'U' characters
+    """
+    return char_counts(goal)
+
+
 def miu_heuristic(state, goal):
     """
     A heuristic function for the MIU problem.
@@ -118,9 +341,31 @@ def miu_heuristic(state, goal):
     length_diff = abs(len(state) - len(goal))
     
     # Character count differences
-    state_counts = {'M': state.count('M'), 'I': state.count('I'), 'U': state.count('U')}
-    goal_counts = {'M': goal.count('M'), 'I': goal.count('I'), 'U': goal.count('U')}
+    m, i, u = char_counts(state)
+    goal_m, goal_i, goal_u = goal_counts(goal)
     
-    char_diff = sum(abs(state_counts[c] - goal_counts[c]) for c in 'MIU')
+    char_diff = abs(m - goal_m) + abs(i - goal_i) + abs(u - goal_u)
     
     return length_diff + char_diff
+
+
+def packed_miu_heuristic(state, goal):
+    """
+    miu_heuristic for the packed states of PackedMIUProblem.
+    
+    Args:
+        state (int): The current packed state
+        goal (int): The goal packed state
+        
+    Returns:
+        int: An estimate of the cost to reach the goal
+    """
+    length, word = miu_bits.from_key(state)
+    goal_length, goal_word = miu_bits.from_key(goal)
+    if goal_length == 0:
+        return 0
+    
+    m, i, u = miu_bits.symbol_counts(length, word)
+    goal_m, goal_i, goal_u = miu_bits.symbol_counts(goal_length, goal_word)
+    
+    return abs(length - goal_length) + abs(m - goal_m) + abs(i - goal_i) + abs(u - goal_u)
@@ -8,7 +8,53 @@ The MIU system consists of strings of M, I, and U characters, with transformatio
 that allow generating new strings from existing ones.
 """
 
-def next_states(s):
+import functools
+
+try:
+    # Optional compiled rules, built with 'python setup.py build_ext --inplace'
+    import miu_core
+except ImportError:
+    miu_core = None
+
+# The rule symbols and patterns as str and as bytes: every function below
+# accepts states of either type and returns states of the same type
+_STR_SYMBOLS = ("M", "I", "U", "III", "UU")
+_BYTES_SYMBOLS = (b"M", b"I", b"U", b"III", b"UU")
+
+def miu_symbols(s):
+    """
+    Get the MIU symbols and rule patterns that match the type of a state.
+    
+    Args:
+        s (str or bytes): An MIU state
+        
+    Returns:
+        tuple: "M", "I", "U", "III" and "UU", as bytes if s is bytes
+    """
+    return _BYTES_SYMBOLS if isinstance(s, bytes) else _STR_SYMBOLS
+
+def all_positions(s, pattern):
+    """
+    Find every occurrence of a pattern, overlapping matches included.
+    
+    Each find() resumes one character after the previous match, so the whole
+    scan is a single linear pass over s.
+    
+    Args:
+        s (str or bytes): The string to search
+        pattern (str or bytes): The pattern to look for, e.g. "III" or "UU"
+        
+    Returns:
+        list: The start positions of all occurrences, in increasing order
+    """
+    positions = []
+    i = s.find(pattern)
+    while i != -1:
+        positions.append(i)
+        i = s.find(pattern, i + 1)
+    return positions
+
+def _next_states_impl(s):
     """
     Generate all possible next states from the current state by applying MIU system rules.
     
@@ -19,66 +65,82 @@ def next_states(s):
     4. If the string contains "UU," you can remove it entirely: x UU y → x y
     
     Args:
-        s (str): The current state (a string of M, I, and U characters)
+        s (str or bytes): The current state (a string of M, I, and U characters)
         
     Returns:
-        list: A list of all possible next states, with duplicates removed
+        tuple: All possible next states, with duplicates removed
     """
+    M, I, U, III, UU = miu_symbols(s)
     results = []
-    seen = set()
 
     # Rule 1: If string ends with 'I', append 'U'
-    if s.endswith("I"):
-        new_s = s + "U"
-        if new_s not in seen:
-            results.append(new_s)
-            seen.add(new_s)
+    if s.endswith(I):
+        results.append(s + U)
 
     # Rule 2: If string starts with 'M', duplicate everything after 'M'
-    if s.startswith("M"):
-        suffix = s[1:]
-        new_s = "M" + suffix + suffix
-        if new_s not in seen:
-            results.append(new_s)
-            seen.add(new_s)
+    if s.startswith(M):
+        # s already starts with the "M" and one copy of the suffix, so only
+        # the slice s[1:] and one concatenation are needed
+        results.append(s + s[1:])
 
     # Rule 3: Replace "III" with "U"
-    idx = 0
-    while "III" in s[idx:]:
-        i = s.index("III", idx)
-        new_s = s[:i] + "U" + s[i+3:]
-        if new_s not in seen:
-            results.append(new_s)
-            seen.add(new_s)
-        idx = i + 1  # Move past this point to find next occurrence
+    for i in all_positions(s, III):
+        results.append(s[:i] + U + s[i+3:])
 
     # Rule 4: Remove "UU"
-    idx = 0
-    while "UU" in s[idx:]:
-        i = s.index("UU", idx)
-        new_s = s[:i] + s[i+2:]
-        if new_s not in seen:
-            results.append(new_s)
-            seen.add(new_s)
-        idx = i + 1
+    for i in all_positions(s, UU):
+        results.append(s[:i] + s[i+2:])
+
+    # Remove duplicates while preserving order; overlapping matches of one
+    # rule can give the same string too, e.g. both "UU" in "MUUU"
+    return tuple(dict.fromkeys(results))
+
+def _next_states_core(s):
+    """
+    Generate all possible next states with the compiled miu_core extension.
+    
+    Args:
+        s (str or bytes): The current state (a string of M, I, and U characters)
+        
+    Returns:
+        tuple: All possible next states, with duplicates removed
+    """
+    if isinstance(s, bytes):
+        # Bytes states are handed to the extension as they are
+        return tuple(miu_core.next_states(s))
+    try:
+        data = s.encode('ascii')
+    except UnicodeEncodeError:
+        # Such a string cannot match any rule pattern but its ends still can
+        return _next_states_impl(s)
+    return tuple(new_s.decode('ascii') for new_s in miu_core.next_states(data))
 
-    return results
+# The same strings are expanded over and over during a search, so the results
+# are memoized. Tuples are returned so the cached value cannot be modified.
+next_states = functools.lru_cache(maxsize=131072)(
+    _next_states_core if miu_core is not None else _next_states_impl)
+
+# Translation table that deletes the MIU alphabet
+_DELETE_MIU = str.maketrans('', '', 'MIU')
 
 def is_valid_miu_string(s):
     """
     Check if a string is a valid MIU string.
     
     Args:
-        s (str): The string to check
+        s (str or bytes): The string to check
         
     Returns:
         bool: True if the string contains only M, I, and U characters and starts with M
     """
     if not s:
         return False
-    if not s.startswith('M'):
+    if not s.startswith(miu_symbols(s)[0]):
         return False
-    return all(c in 'MIU' for c in s)
+    # Deleting every M, I and U in C leaves nothing for a valid string
+    if isinstance(s, bytes):
+        return not s.translate(None, b'MIU')
+    return not s.translate(_DELETE_MIU)
 
 def apply_rule(s, rule_num, occurrence=0):
     """
@@ -97,27 +159,14 @@ def apply_rule(s, rule_num, occurrence=0):
             return s + "U"
     elif rule_num == 2:
         if s.startswith("M"):
-            suffix = s[1:]
-            return "M" + suffix + suffix
+            return s + s[1:]
     elif rule_num == 3:
-        occurrences = []
-        idx = 0
-        while "III" in s[idx:]:
-            i = s.index("III", idx)
-            occurrences.append(i)
-            idx = i + 1
-        
+        occurrences = all_positions(s, "III")
         if occurrence < len(occurrences):
             i = occurrences[occurrence]
             return s[:i] + "U" + s[i+3:]
     elif rule_num == 4:
-        occurrences = []
-        idx = 0
-        while "UU" in s[idx:]:
-            i = s.index("UU", idx)
-            occurrences.append(i)
-            idx = i + 1
-        
+        occurrences = all_positions(s, "UU")
         if occurrence < len(occurrences):
             i = occurrences[occurrence]
             return s[:i] + s[i+2:]
@@ -10,6 +10,9 @@ import heapq
 class Node:
     """A node in the search tree/graph."""
     
+    # Searches keep every visited node, so nodes carry no per-instance __dict__
+    __slots__ = ('state', 'parent', 'action', 'path_cost', '_path', 'depth')
+    
     def __init__(self, state, parent=None, action=None, path_cost=0):
         """
         Create a search node.
@@ -24,18 +27,17 @@ class Node:
         self.parent = parent
         self.action = action
         self.path_cost = path_cost
-        self.depth = 0
-        if parent:
-            self.depth = parent.depth + 1
+        self._path = None
+        self.depth = parent.depth + 1 if parent else 0
     
     def __lt__(self, other):
         """Comparison operator for priority queue."""
         return self.path_cost < other.path_cost
     
     def expand(self, problem):
-        """Return a list of nodes reachable from this node."""
-        return [self.child_node(problem, action, next_state)
-                for action, next_state in problem.get_successors(self.state)]
+        """Yield the nodes reachable from this node."""
+        for action, next_state in problem.get_successors(self.state):
+            yield self.child_node(problem, action, next_state)
     
     def child_node(self, problem, action, next_state):
         """Create a child node."""
@@ -48,11 +50,15 @@ class Node:
     
     def path(self):
         """Return a list of nodes forming the path from the root to this node."""
-        node, path_back = self, []
-        while node:
-            path_back.append(node)
-            node = node.parent
-        return list(reversed(path_back))
+        # A node's ancestors never change, so the walk is done only once
+        if self._path is None:
+            node, path_back = self, []
+            while node:
+                path_back.append(node)
+                node = node.parent
+            path_back.reverse()
+            self._path = path_back
+        return list(self._path)
     
     def __eq__(self, other):
         """Nodes are equal if they represent the same state."""
@@ -83,6 +89,21 @@ class Problem:
         """
         raise NotImplementedError
     
+    def get_predecessors(self, state):
+        """
+        Return a list of (action, state) pairs from which the given state is reachable.
+        
+        Each action is the one that leads from the returned state to the given
+        state. Only needed for bidirectional search.
+        
+        Args:
+            state: The current state
+            
+        Returns:
+            list: A list of (action, state) pairs
+        """
+        raise NotImplementedError
+    
     def is_goal(self, state):
         """
         Return True if the state is a goal state.
@@ -110,13 +131,158 @@ class Problem:
         return 1  # Default is uniform cost
 
 
-def breadth_first_search(problem, max_iterations=1000):
+class StateTable:
+    """
+    Interns states as small ints.
+    
+    Each distinct state gets the next free id the first time it is seen, so
+    ids are dense and can also index lists.
+    """
+    
+    def __init__(self):
+        """Create an empty table."""
+        self.ids = {}
+        self.states = []
+    
+    def intern(self, state):
+        """
+        Return the id of a state, adding the state if it is new.
+        
+        Args:
+            state: The state to intern
+            
+        Returns:
+            int: The state's id
+        """
+        state_id = self.ids.get(state)
+        if state_id is None:
+            state_id = self.ids[state] = len(self.states)
+            self.states.append(state)
+        return state_id
+    
+    def __getitem__(self, state_id):
+        """Return the state with the given id."""
+        return self.states[state_id]
+    
+    def __len__(self):
+        """Return the number of interned states."""
+        return len(self.states)
+
+
+class InternedProblem(Problem):
+    """
+    A problem whose states are replaced by StateTable ids.
+    
+    The search then hashes and compares ints, e.g. instead of long MIU
+    strings; use decode to get the original states back for display.
+    """
+    
+    def __init__(self, problem, table=None):
+        """
+        Wrap a problem.
+        
+        Args:
+            problem (Problem): The problem to wrap
+            table (StateTable): The table to intern states in, a new one by default
+        """
+        self.problem = problem
+        self.table = table if table is not None else StateTable()
+        goal = self.table.intern(problem.goal) if problem.goal is not None else None
+        super().__init__(self.table.intern(problem.initial_state), goal)
+    
+    def decode(self, state):
+        """
+        Return the original state for an id.
+        
+        Args:
+            state (int): The state id
+            
+        Returns:
+            The state of the wrapped problem
+        """
+        return self.table[state]
+    
+    def heuristic(self, heuristic):
+        """
+        Adapt a heuristic of the wrapped problem to state ids.
+        
+        Args:
+            heuristic (function): A heuristic taking original states
+            
+        Returns:
+            function: The same heuristic taking state ids
+        """
+        states = self.table.states
+        return lambda state, goal: heuristic(states[state], states[goal])
+    
+    def get_successors(self, state):
+        """
+        Return a list of (action, state) pairs reachable from the given state.
+        
+        Args:
+            state (int): The current state id
+            
+        Returns:
+            list: A list of (action, state id) pairs
+        """
+        intern = self.table.intern
+        return [(action, intern(next_state))
+                for action, next_state in self.problem.get_successors(self.table[state])]
+    
+    def get_predecessors(self, state):
+        """
+        Return a list of (action, state) pairs from which the given state is reachable.
+        
+        Args:
+            state (int): The current state id
+            
+        Returns:
+            list: A list of (action, state id) pairs
+        """
+        intern = self.table.intern
+        return [(action, intern(prev_state))
+                for action, prev_state in self.problem.get_predecessors(self.table[state])]
+    
+    def is_goal(self, state):
+        """
+        Return True if the state is a goal state.
+        
+        Args:
+            state (int): The state id to check
+            
+        Returns:
+            bool: True if the state is a goal state
+        """
+        if self.goal is not None:
+            return state == self.goal
+        return self.problem.is_goal(self.table[state])
+    
+    def get_cost(self, state, action, next_state):
+        """
+        Return the cost of taking action from state to reach next_state.
+        
+        Args:
+            state (int): The current state id
+            action: The action to take
+            next_state (int): The resulting state id
+            
+        Returns:
+            int: The cost of the action
+        """
+        return self.problem.get_cost(self.table[state], action, self.table[next_state])
+
+
+def breadth_first_search(problem, max_iterations=1000, seen=None):
     """
     Breadth-first search algorithm.
     
     Args:
         problem (Problem): The problem to solve
         max_iterations (int): Maximum number of iterations
+        seen: Optional empty set-like object (add and in) that records the
+            enqueued states, e.g. a bloom_filter.BloomFilter to bound memory on
+            large searches; its false positives skip states that were never
+            enqueued, so a solution can be missed or be longer than needed
         
     Returns:
         tuple: (solution_node, visited_nodes, iterations)
@@ -126,25 +292,183 @@ def breadth_first_search(problem, max_iterations=1000):
         return node, [node], 0
     
     frontier = deque([node])
-    explored = set()
+    # Every state that was ever put in the frontier; these are exactly the
+    # explored and frontier states, so one lookup per child covers both
+    if seen is None:
+        seen = set()
+    seen.add(node.state)
     visited_nodes = [node]
     iterations = 0
     
     while frontier and iterations < max_iterations:
-        iterations += 1
         node = frontier.popleft()
-        explored.add(node.state)
+        iterations += 1
         
         for child in node.expand(problem):
             visited_nodes.append(child)
             if problem.is_goal(child.state):
                 return child, visited_nodes, iterations
-            if child.state not in explored and child not in frontier:
+            if child.state not in seen:
+                seen.add(child.state)
                 frontier.append(child)
     
     return None, visited_nodes, iterations
 
 
+def miu_breadth_first_search(problem, max_iterations=1000):
+    """
+    Breadth-first search for an MIUProblem with the compiled search_numba kernel.
+    
+    Returns the same solution, visited nodes and iteration count as
+    breadth_first_search on the same problem; requires Numba.
+    
+    Args:
+        problem (MIUProblem): The MIU problem to solve
+        max_iterations (int): Maximum number of iterations
+        
+    Returns:
+        tuple: (solution_node, visited_nodes, iterations)
+    """
+    # search_numba builds on this module's Node, so it is imported on first use
+    from search_numba import miu_breadth_first_search as compiled_search
+    return compiled_search(problem, max_iterations)
+
+
+def breadth_first_path_search(problem, max_iterations=1000):
+    """
+    Breadth-first search that keeps no search nodes.
+    
+    Expands the same states in the same order as breadth_first_search, but
+    the frontier holds states and each reached state is recorded once in a
+    came_from dict. Nodes are only built for the solution path, so memory
+    grows with the number of distinct states rather than generated children.
+    
+    Args:
+        problem (Problem): The problem to solve
+        max_iterations (int): Maximum number of iterations
+        
+    Returns:
+        tuple: (solution_node, came_from, iterations) where came_from maps
+            every reached state to its (previous_state, action), or to None
+            for the initial state
+    """
+    start = problem.initial_state
+    came_from = {start: None}
+    if problem.is_goal(start):
+        return Node(start), came_from, 0
+    
+    frontier = deque([start])
+    iterations = 0
+    
+    while frontier and iterations < max_iterations:
+        iterations += 1
+        state = frontier.popleft()
+        
+        for action, next_state in problem.get_successors(state):
+            if next_state in came_from:
+                continue
+            came_from[next_state] = (state, action)
+            if problem.is_goal(next_state):
+                return _path_node(problem, came_from, next_state), came_from, iterations
+            frontier.append(next_state)
+    
+    return None, came_from, iterations
+
+
+def _path_node(problem, came_from, state):
+    """Build the Node chain from the initial state to state out of came_from."""
+    steps = []
+    while came_from[state] is not None:
+        prev_state, action = came_from[state]
+        steps.append((action, state))
+        state = prev_state
+    
+    node = Node(state)
+    for action, next_state in reversed(steps):
+        node = node.child_node(problem, action, next_state)
+    return node
+
+
+def bidirectional_breadth_first_search(problem, max_iterations=1000):
+    """
+    Bidirectional breadth-first search algorithm.
+    
+    Searches forward from the initial state and backward from problem.goal,
+    always expanding a whole layer of the smaller frontier, until the two
+    searches meet. The problem has to implement get_predecessors. With
+    uniform action costs the path found is a shortest one.
+    
+    Nodes of the backward search have the next state towards the goal as
+    their parent, with the action that leads to it.
+    
+    Args:
+        problem (Problem): The problem to solve
+        max_iterations (int): Maximum number of iterations
+        
+    Returns:
+        tuple: (solution_node, visited_nodes, iterations)
+    """
+    node = Node(problem.initial_state)
+    if problem.is_goal(node.state):
+        return node, [node], 0
+    
+    goal_node = Node(problem.goal)
+    fwd_nodes = {node.state: node}
+    bwd_nodes = {goal_node.state: goal_node}
+    fwd_frontier = [node]
+    bwd_frontier = [goal_node]
+    visited_nodes = [node, goal_node]
+    iterations = 0
+    
+    while fwd_frontier and bwd_frontier and iterations < max_iterations:
+        forward = len(fwd_frontier) <= len(bwd_frontier)
+        if forward:
+            frontier, nodes, other = fwd_frontier, fwd_nodes, bwd_nodes
+        else:
+            frontier, nodes, other = bwd_frontier, bwd_nodes, fwd_nodes
+        
+        next_layer = []
+        for node in frontier:
+            if iterations >= max_iterations:
+                break
+            iterations += 1
+            
+            if forward:
+                pairs = problem.get_successors(node.state)
+            else:
+                pairs = problem.get_predecessors(node.state)
+            for action, state in pairs:
+                if state in nodes:
+                    continue
+                if forward:
+                    child = node.child_node(problem, action, state)
+                else:
+                    child = Node(state, node, action,
+                                 node.path_cost + problem.get_cost(state, action, node.state))
+                nodes[state] = child
+                visited_nodes.append(child)
+                next_layer.append(child)
+                
+                if state in other:
+                    return _join_paths(problem, fwd_nodes[state], bwd_nodes[state]), visited_nodes, iterations
+        
+        if forward:
+            fwd_frontier = next_layer
+        else:
+            bwd_frontier = next_layer
+    
+    return None, visited_nodes, iterations
+
+
+def _join_paths(problem, fwd_node, bwd_node):
+    """Extend a forward search node along a backward search chain to the goal."""
+    node = fwd_node
+    while bwd_node.parent:
+        node = node.child_node(problem, bwd_node.action, bwd_node.parent.state)
+        bwd_node = bwd_node.parent
+    return node
+
+
 def depth_first_search(problem, max_depth=50, max_iterations=1000):
     """
     Depth-first search algorithm.
@@ -162,26 +486,45 @@ def depth_first_search(problem, max_depth=50, max_iterations=1000):
         return node, [node], 0
     
     frontier = [node]
-    explored = set()
+    # Every state that was ever pushed, i.e. the explored and frontier states
+    seen = {node.state}
     visited_nodes = [node]
     iterations = 0
     
     while frontier and iterations < max_iterations:
         iterations += 1
         node = frontier.pop()
-        explored.add(node.state)
         
         if node.depth < max_depth:
             for child in node.expand(problem):
                 visited_nodes.append(child)
                 if problem.is_goal(child.state):
                     return child, visited_nodes, iterations
-                if child.state not in explored and child not in frontier:
+                if child.state not in seen:
+                    seen.add(child.state)
                     frontier.append(child)
     
     return None, visited_nodes, iterations
 
 
+def _cached_heuristic(heuristic, goal):
+    """
+    Return heuristic as a function of the state alone, computed once per state.
+    
+    The goal is fixed during a search and states are reached again and again,
+    so each value is kept for the rest of the search.
+    """
+    h_cache = {}
+    
+    def h(state):
+        value = h_cache.get(state)
+        if value is None:
+            value = h_cache[state] = heuristic(state, goal)
+        return value
+    
+    return h
+
+
 def a_star_search(problem, heuristic, max_iterations=1000):
     """
     A* search algorithm.
@@ -198,14 +541,24 @@ def a_star_search(problem, heuristic, max_iterations=1000):
     if problem.is_goal(node.state):
         return node, [node], 0
     
-    frontier = [(node.path_cost + heuristic(node.state, problem.goal), node)]
+    h = _cached_heuristic(heuristic, problem.goal)
+    
+    # The heap may hold outdated entries for a state; open_best keeps the
+    # f value of its newest entry, and any other entry is skipped when popped
+    f = node.path_cost + h(node.state)
+    counter = 0
+    frontier = [(f, counter, node)]
+    open_best = {node.state: f}
     explored = set()
     visited_nodes = [node]
     iterations = 0
     
     while frontier and iterations < max_iterations:
+        f, _, node = heapq.heappop(frontier)
+        if open_best.get(node.state) != f:
+            continue
+        del open_best[node.state]
         iterations += 1
-        _, node = heapq.heappop(frontier)
         
         if problem.is_goal(node.state):
             return node, visited_nodes, iterations
@@ -214,15 +567,13 @@ def a_star_search(problem, heuristic, max_iterations=1000):
         
         for child in node.expand(problem):
             visited_nodes.append(child)
-            if child.state not in explored and child not in [n for _, n in frontier]:
-                heapq.heappush(frontier, (child.path_cost + heuristic(child.state, problem.goal), child))
-            elif child in [n for _, n in frontier]:
-                # If child is in frontier with higher path_cost, replace it
-                for i, (f, n) in enumerate(frontier):
-                    if n.state == child.state:
-                        if f > child.path_cost + heuristic(child.state, problem.goal):
-                            frontier[i] = (child.path_cost + heuristic(child.state, problem.goal), child)
-                            heapq.heapify(frontier)
-                        break
+            if child.state in explored:
+                continue
+            f = child.path_cost + h(child.state)
+            # Only push a child that improves on the frontier entry for its state
+            if child.state not in open_best or f < open_best[child.state]:
+                counter += 1
+                heapq.heappush(frontier, (f, counter, child))
+                open_best[child.state] = f
     
     return None, visited_nodes, iterations
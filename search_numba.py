@@ -0,0 +1,468 @@
+"""
+Search Numba Module
+
+This module implements Numba-compiled breadth-first and depth-first search for
+maze problems. The grid is searched as a flat uint8 array with cells indexed
+y * width + x, so visited tests are array lookups instead of hashing tuples.
+
+It also implements a compiled breadth-first search for MIU problems. MIU
+strings are stored as int8 symbol codes (M=0, I=1, U=2) in one growing pool,
+and the set of seen strings is an open-addressing hash table over the pool.
+"""
+
+import numpy as np
+from numba import njit
+
+from search import Node
+
+# Neighbor offsets in the order of Maze.get_neighbors: Down, Right, Up, Left
+_DX = np.array([0, 1, 0, -1], np.int32)
+_DY = np.array([1, 0, -1, 0], np.int32)
+_ACTIONS = {(1, 0): "Right", (-1, 0): "Left", (0, 1): "Down", (0, -1): "Up"}
+
+# MIU symbol codes, as in miu_bits
+_MIU_ENCODE = bytes.maketrans(b"MIU", b"\x00\x01\x02")
+_MIU_DECODE = bytes.maketrans(b"\x00\x01\x02", b"MIU")
+
+# Action names by MIU rule, as in MIUProblem.get_successors
+_MIU_ACTIONS = {
+    1: "Rule 1: Append U",
+    2: "Rule 2: Duplicate after M",
+    3: "Rule 3: Replace III with U at position {}",
+    4: "Rule 4: Remove UU at position {}",
+}
+
+
+@njit(cache=True, nogil=True)
+def grid_neighbors(x, y, walls):
+    """
+    Find the open neighbors of a maze cell.
+
+    Args:
+        x (int): The x-coordinate
+        y (int): The y-coordinate
+        walls (numpy.ndarray): 2-D uint8 array, 1 for a wall
+
+    Returns:
+        numpy.ndarray: An int32 array of shape (k, 2) holding the (x, y) of
+            the k open neighbors in Down, Right, Up, Left order
+    """
+    height, width = walls.shape
+    out = np.empty((4, 2), np.int32)
+    k = 0
+    for d in range(4):
+        nx, ny = x + _DX[d], y + _DY[d]
+        if 0 <= nx < width and 0 <= ny < height and walls[ny, nx] == 0:
+            out[k, 0] = nx
+            out[k, 1] = ny
+            k += 1
+    return out[:k]
+
+
+@njit(cache=True, nogil=True)
+def neighbor_table(walls):
+    """
+    Compute the neighbor table of a whole maze in one compiled pass.
+
+    Args:
+        walls (numpy.ndarray): 2-D uint8 array, 1 for a wall
+
+    Returns:
+        numpy.ndarray: An int32 array of shape (height * width, 4) holding, for
+            every cell y * width + x, the index of its Down, Right, Up and Left
+            neighbors, or -1 where the move is blocked
+    """
+    height, width = walls.shape
+    adj = np.full((height * width, 4), -1, np.int32)
+    for y in range(height):
+        for x in range(width):
+            for d in range(4):
+                nx, ny = x + _DX[d], y + _DY[d]
+                if 0 <= nx < width and 0 <= ny < height and walls[ny, nx] == 0:
+                    adj[y * width + x, d] = ny * width + nx
+    return adj
+
+
+@njit(cache=True, nogil=True)
+def _grid_search(open_cells, width, start, goal, max_iterations, max_depth, lifo):
+    """
+    Search a grid with an array-backed queue (BFS) or stack (DFS).
+
+    Args:
+        open_cells (numpy.ndarray): Flat uint8 array, nonzero for cells that are not walls
+        width (int): Width of the grid
+        start (int): Index of the start cell
+        goal (int): Index of the goal cell
+        max_iterations (int): Maximum number of expansions
+        max_depth (int): Cells at this depth are not expanded
+        lifo (bool): Use a stack (DFS) instead of a queue (BFS)
+
+    Returns:
+        tuple: (parents, order, count, iterations, found) where parents[i] is
+            the cell cell i was reached from and the first count entries of
+            order are the reached cells in discovery order
+    """
+    n = open_cells.shape[0]
+    height = n // width
+    parents = np.full(n, -1, np.int32)
+    depth = np.zeros(n, np.int32)
+    order = np.empty(n, np.int32)
+    frontier = np.empty(n, np.int32)
+
+    parents[start] = start
+    order[0] = start
+    count = 1
+    frontier[0] = start
+    head, tail = 0, 1
+    iterations = 0
+
+    while head < tail and iterations < max_iterations:
+        iterations += 1
+        if lifo:
+            tail -= 1
+            cell = frontier[tail]
+        else:
+            cell = frontier[head]
+            head += 1
+
+        if depth[cell] >= max_depth:
+            continue
+
+        y, x = cell // width, cell % width
+        for k in range(4):
+            nx, ny = x + _DX[k], y + _DY[k]
+            if nx < 0 or nx >= width or ny < 0 or ny >= height:
+                continue
+            child = ny * width + nx
+            # Each cell enters the frontier at most once
+            if open_cells[child] == 0 or parents[child] != -1:
+                continue
+            parents[child] = cell
+            depth[child] = depth[cell] + 1
+            order[count] = child
+            count += 1
+            if child == goal:
+                return parents, order, count, iterations, True
+            frontier[tail] = child
+            tail += 1
+
+    return parents, order, count, iterations, False
+
+
+def _run(problem, max_iterations, max_depth, lifo):
+    """Run the compiled search on a MazeProblem and rebuild the search nodes."""
+    maze = problem.maze
+    width = maze.width
+    open_cells = (maze.walls == 0).reshape(-1).astype(np.uint8)
+    start = problem.initial_state[1] * width + problem.initial_state[0]
+    goal = problem.goal[1] * width + problem.goal[0]
+
+    if start == goal:
+        node = Node(problem.initial_state)
+        return node, [node], 0
+
+    parents, order, count, iterations, found = _grid_search(
+        open_cells, width, start, goal, max_iterations, max_depth, lifo)
+
+    # Parents are always discovered before their children
+    nodes = {}
+    visited_nodes = []
+    for cell in order[:count].tolist():
+        state = (cell % width, cell // width)
+        parent = nodes.get(int(parents[cell]))
+        if parent is None:
+            node = Node(state)
+        else:
+            dx, dy = state[0] - parent.state[0], state[1] - parent.state[1]
+            node = parent.child_node(problem, _ACTIONS[(dx, dy)], state)
+        nodes[cell] = node
+        visited_nodes.append(node)
+
+    solution = nodes[goal] if found else None
+    return solution, visited_nodes, iterations
+
+
+def grid_breadth_first_search(problem, max_iterations=1000):
+    """
+    Compiled breadth-first search for a MazeProblem.
+
+    Expands the same cells in the same order as search.breadth_first_search.
+    The visited nodes hold each reached cell once.
+
+    Args:
+        problem (MazeProblem): The maze problem to solve
+        max_iterations (int): Maximum number of iterations
+
+    Returns:
+        tuple: (solution_node, visited_nodes, iterations)
+    """
+    return _run(problem, max_iterations, np.iinfo(np.int32).max, False)
+
+
+def grid_depth_first_search(problem, max_depth=50, max_iterations=1000):
+    """
+    Compiled depth-first search for a MazeProblem.
+
+    Expands the same cells in the same order as search.depth_first_search.
+    The visited nodes hold each reached cell once.
+
+    Args:
+        problem (MazeProblem): The maze problem to solve
+        max_depth (int): Maximum depth to search
+        max_iterations (int): Maximum number of iterations
+
+    Returns:
+        tuple: (solution_node, visited_nodes, iterations)
+    """
+    return _run(problem, max_iterations, max_depth, True)
+
+
+@njit(cache=True)
+def _grow(arr, size):
+    """Return arr, or a copy of it with at least size elements."""
+    if size <= arr.shape[0]:
+        return arr
+    out = np.empty(max(size, 2 * arr.shape[0]), arr.dtype)
+    out[:arr.shape[0]] = arr
+    return out
+
+
+@njit(cache=True)
+def _hash_symbols(pool, start, length):
+    """FNV-1a hash of length symbols of pool from start."""
+    h = np.int64(-3750763034362895579)
+    for k in range(length):
+        h = (h ^ pool[start + k]) * np.int64(1099511628211)
+    return h
+
+
+@njit(cache=True)
+def _miu_search(start_codes, goal_codes, max_iterations, max_length):
+    """
+    Breadth-first search over MIU strings given as symbol codes.
+    
+    Every generated child is recorded as an event (string id, parent event,
+    rule, position), duplicates included, so the caller can rebuild the
+    visited nodes of search.breadth_first_search. Event 0 is the root.
+    
+    Args:
+        start_codes (numpy.ndarray): int8 codes of the initial string
+        goal_codes (numpy.ndarray): int8 codes of the goal string
+        max_iterations (int): Maximum number of expansions
+        max_length (int): Children longer than this are not generated, -1 for no limit
+        
+    Returns:
+        tuple: (pool, st_start, st_len, ev_state, ev_parent, ev_rule, ev_pos,
+            iterations, goal_event) where string i is
+            pool[st_start[i]:st_start[i] + st_len[i]], the ev_ arrays hold one
+            entry per event and goal_event is -1 if the goal was not reached
+    """
+    n0 = start_codes.shape[0]
+    pool = np.empty(max(1024, 4 * n0), np.int8)
+    pool[:n0] = start_codes
+    top = n0
+    
+    st_start = np.zeros(1024, np.int64)
+    st_len = np.zeros(1024, np.int64)
+    st_hash = np.zeros(1024, np.int64)
+    st_len[0] = n0
+    st_hash[0] = _hash_symbols(pool, 0, n0)
+    n_states = 1
+    
+    table = np.full(2048, -1, np.int64)
+    mask = table.shape[0] - 1
+    table[st_hash[0] & mask] = 0
+    
+    ev_state = np.zeros(1024, np.int64)
+    ev_parent = np.full(1024, -1, np.int64)
+    ev_rule = np.zeros(1024, np.int8)
+    ev_pos = np.zeros(1024, np.int64)
+    n_events = 1
+    
+    queue = np.zeros(1024, np.int64)
+    head, tail = 0, 1
+    iterations = 0
+    goal_len = goal_codes.shape[0]
+    
+    while head < tail and iterations < max_iterations:
+        iterations += 1
+        ev = queue[head]
+        head += 1
+        sid = ev_state[ev]
+        s, n = st_start[sid], st_len[sid]
+        
+        # Matches in rule order: rule 1, rule 2, then rule 3 and rule 4 by position
+        cand_rule = np.empty(n + 2, np.int8)
+        cand_pos = np.empty(n + 2, np.int64)
+        k = 0
+        if n > 0 and pool[s + n - 1] == 1:
+            cand_rule[k] = 1
+            k += 1
+        if n > 0 and pool[s] == 0:
+            cand_rule[k] = 2
+            k += 1
+        for i in range(n - 2):
+            if pool[s + i] == 1 and pool[s + i + 1] == 1 and pool[s + i + 2] == 1:
+                cand_rule[k] = 3
+                cand_pos[k] = i
+                k += 1
+        for i in range(n - 1):
+            if pool[s + i] == 2 and pool[s + i + 1] == 2:
+                cand_rule[k] = 4
+                cand_pos[k] = i
+                k += 1
+        
+        for c in range(k):
+            rule, i = cand_rule[c], cand_pos[c]
+            
+            # Build the child at the top of the pool
+            if rule == 1:
+                length = n + 1
+            elif rule == 2:
+                length = 2 * n - 1
+            else:
+                length = n - 2
+            if max_length >= 0 and length > max_length:
+                continue
+            pool = _grow(pool, top + length)
+            if rule == 1:
+                pool[top:top + n] = pool[s:s + n]
+                pool[top + n] = 2
+            elif rule == 2:
+                pool[top:top + n] = pool[s:s + n]
+                pool[top + n:top + length] = pool[s + 1:s + n]
+            elif rule == 3:
+                pool[top:top + i] = pool[s:s + i]
+                pool[top + i] = 2
+                pool[top + i + 1:top + length] = pool[s + i + 3:s + n]
+            else:
+                pool[top:top + i] = pool[s:s + i]
+                pool[top + i:top + length] = pool[s + i + 2:s + n]
+            
+            # Look the child up among the seen strings
+            h = _hash_symbols(pool, top, length)
+            slot = h & mask
+            child = -1
+            while table[slot] != -1:
+                other = table[slot]
+                if st_hash[other] == h and st_len[other] == length:
+                    o = st_start[other]
+                    same = True
+                    for j in range(length):
+                        if pool[o + j] != pool[top + j]:
+                            same = False
+                            break
+                    if same:
+                        child = other
+                        break
+                slot = (slot + 1) & mask
+            
+            is_new = child == -1
+            if is_new:
+                child = n_states
+                n_states += 1
+                st_start = _grow(st_start, n_states)
+                st_len = _grow(st_len, n_states)
+                st_hash = _grow(st_hash, n_states)
+                st_start[child] = top
+                st_len[child] = length
+                st_hash[child] = h
+                table[slot] = child
+                top += length
+                
+                # Keep the table at most half full
+                if 2 * n_states > table.shape[0]:
+                    table = np.full(2 * table.shape[0], -1, np.int64)
+                    mask = table.shape[0] - 1
+                    for t in range(n_states):
+                        slot = st_hash[t] & mask
+                        while table[slot] != -1:
+                            slot = (slot + 1) & mask
+                        table[slot] = t
+            
+            ev_state = _grow(ev_state, n_events + 1)
+            ev_parent = _grow(ev_parent, n_events + 1)
+            ev_rule = _grow(ev_rule, n_events + 1)
+            ev_pos = _grow(ev_pos, n_events + 1)
+            ev_state[n_events] = child
+            ev_parent[n_events] = ev
+            ev_rule[n_events] = rule
+            ev_pos[n_events] = i
+            n_events += 1
+            
+            if not is_new:
+                continue
+            
+            # Goal test, as in breadth_first_search; a repeated string cannot
+            # be the goal, since it would have been found the first time
+            if length == goal_len:
+                o = st_start[child]
+                same = True
+                for j in range(length):
+                    if pool[o + j] != goal_codes[j]:
+                        same = False
+                        break
+                if same:
+                    return (pool[:top], st_start[:n_states], st_len[:n_states],
+                            ev_state[:n_events], ev_parent[:n_events], ev_rule[:n_events],
+                            ev_pos[:n_events], iterations, n_events - 1)
+            
+            queue = _grow(queue, tail + 1)
+            queue[tail] = n_events - 1
+            tail += 1
+    
+    return (pool[:top], st_start[:n_states], st_len[:n_states],
+            ev_state[:n_events], ev_parent[:n_events], ev_rule[:n_events],
+            ev_pos[:n_events], iterations, -1)
+
+
+def _miu_ascii(state):
+    """Return an MIU state, str or bytes, as ASCII bytes."""
+    return state if isinstance(state, bytes) else state.encode("ascii")
+
+
+def miu_breadth_first_search(problem, max_iterations=1000):
+    """
+    Compiled breadth-first search for an MIUProblem.
+    
+    Returns the same solution, visited nodes and iteration count as
+    search.breadth_first_search on the same problem, including its
+    goal_reachable and max_length pruning, and states of the same type
+    (str or bytes) as the problem.
+    
+    Args:
+        problem (MIUProblem): The MIU problem to solve
+        max_iterations (int): Maximum number of iterations
+        
+    Returns:
+        tuple: (solution_node, visited_nodes, iterations)
+    """
+    node = Node(problem.initial_state)
+    if problem.is_goal(node.state):
+        return node, [node], 0
+    if not problem.goal_reachable:
+        # The problem gives no successors, so the root is expanded and nothing else
+        return None, [node], min(1, max_iterations)
+    
+    start = np.frombuffer(_miu_ascii(problem.initial_state).translate(_MIU_ENCODE), np.int8)
+    goal = np.frombuffer(_miu_ascii(problem.goal).translate(_MIU_ENCODE), np.int8)
+    max_length = -1 if problem.max_length is None else problem.max_length
+    (pool, st_start, st_len, ev_state, ev_parent, ev_rule, ev_pos,
+     iterations, goal_event) = _miu_search(start, goal, max_iterations, max_length)
+    
+    # Decode the whole pool at once, every string is a slice of it
+    text = pool.tobytes().translate(_MIU_DECODE)
+    if not isinstance(problem.initial_state, bytes):
+        text = text.decode("ascii")
+    strings = [text[i:i + n] for i, n in zip(st_start.tolist(), st_len.tolist())]
+    
+    # Parents always come before their children
+    visited_nodes = [node]
+    events = zip(ev_state.tolist(), ev_parent.tolist(), ev_rule.tolist(), ev_pos.tolist())
+    next(events)
+    for sid, parent, rule, pos in events:
+        action = _MIU_ACTIONS[rule].format(pos)
+        visited_nodes.append(visited_nodes[parent].child_node(problem, action, strings[sid]))
+    
+    solution = visited_nodes[goal_event] if goal_event >= 0 else None
+    return solution, visited_nodes, iterations
@@ -0,0 +1,22 @@
+"""
+Build script for the optional compiled MIU extension.
+
+Run 'python setup.py build_ext --inplace' to build miu_core next to the other
+modules. miu_system falls back to its pure-Python rules when it is missing.
+"""
+
+import os
+
+from setuptools import Extension, setup
+from Cython.Build import cythonize
+
+# MSVC does not take GCC-style flags
+compile_args = [] if os.name == "nt" else ["-O3"]
+
+setup(
+    name="ai-agent-miu-core",
+    ext_modules=cythonize(
+        [Extension("miu_core", ["miu_core.pyx"], extra_compile_args=compile_args)],
+        language_level=3,
+    ),
+)
@@ -2,6 +2,141 @@
  * AI Agent Interface JavaScript
  */
 
+/**
+ * Draw an MIU search graph on a canvas.
+ *
+ * Nodes are laid out in layers by their depth in the search tree, counted
+ * from the initial state, which the server sends as the first node.
+ */
+function drawMiuGraph(canvas, graph) {
+    const ctx = canvas.getContext('2d');
+    ctx.clearRect(0, 0, canvas.width, canvas.height);
+    
+    if (graph.nodes.length === 0) {
+        return;
+    }
+    
+    // Compute the depth of every node from the parent -> child edges
+    const children = {};
+    const hasParent = new Set();
+    graph.edges.forEach(function([parent, child]) {
+        (children[parent] = children[parent] || []).push(child);
+        hasParent.add(child);
+    });
+    
+    const depth = {};
+    const layers = [];
+    // The initial state can have a parent too, when a rule regenerates it
+    // (e.g. M -> M), so the layering starts from it rather than from the
+    // nodes without incoming edges
+    const queue = [graph.nodes[0]].concat(
+        graph.nodes.filter(n => n !== graph.nodes[0] && !hasParent.has(n)));
+    queue.forEach(n => { depth[n] = 0; });
+    while (queue.length > 0) {
+        const node = queue.shift();
+        (layers[depth[node]] = layers[depth[node]] || []).push(node);
+        (children[node] || []).forEach(function(child) {
+            if (!(child in depth)) {
+                depth[child] = depth[node] + 1;
+                queue.push(child);
+            }
+        });
+    }
+    
+    // Place the nodes, one row per depth
+    const pos = {};
+    const rowHeight = canvas.height / (layers.length + 1);
+    layers.forEach(function(layer, d) {
+        const colWidth = canvas.width / (layer.length + 1);
+        layer.forEach(function(node, i) {
+            pos[node] = [colWidth * (i + 1), rowHeight * (d + 1)];
+        });
+    });
+    
+    const pathEdges = new Set();
+    for (let i = 0; i + 1 < graph.path.length; i++) {
+        pathEdges.add(graph.path[i] + '>' + graph.path[i + 1]);
+    }
+    const pathNodes = new Set(graph.path);
+    
+    // Draw the edges
+    graph.edges.forEach(function([parent, child]) {
+        if (!(parent in pos) || !(child in pos)) {
+            return;
+        }
+        const onPath = pathEdges.has(parent + '>' + child);
+        ctx.strokeStyle = onPath ? 'green' : 'gray';
+        ctx.lineWidth = onPath ? 2 : 1;
+        ctx.beginPath();
+        ctx.moveTo(pos[parent][0], pos[parent][1]);
+        ctx.lineTo(pos[child][0], pos[child][1]);
+        ctx.stroke();
+    });
+    
+    // Draw the nodes, labels only while they stay readable
+    const radius = Math.max(3, Math.min(12, 300 / graph.nodes.length));
+    const showLabels = graph.nodes.length <= 60;
+    ctx.font = '10px sans-serif';
+    ctx.textAlign = 'center';
+    ctx.textBaseline = 'middle';
+    graph.nodes.forEach(function(node) {
+        if (!(node in pos)) {
+            return;
+        }
+        const [x, y] = pos[node];
+        ctx.fillStyle = pathNodes.has(node) ? 'green' : 'lightblue';
+        ctx.beginPath();
+        ctx.arc(x, y, radius, 0, 2 * Math.PI);
+        ctx.fill();
+        if (showLabels) {
+            ctx.fillStyle = 'black';
+            ctx.fillText(node, x, y - radius - 6);
+        }
+    });
+}
+
+/**
+ * Draw a maze grid on a canvas, optionally with visited cells and a solution path.
+ */
+function drawMaze(canvas, grid, visited, solution) {
+    const ctx = canvas.getContext('2d');
+    const height = grid.length;
+    const width = height > 0 ? grid[0].length : 0;
+    const cell = Math.floor(Math.min(canvas.width / width, canvas.height / height));
+    
+    const marks = {};
+    (visited || []).forEach(([x, y]) => { marks[x + ',' + y] = 'lightblue'; });
+    (solution || []).forEach(([x, y]) => { marks[x + ',' + y] = 'yellow'; });
+    
+    ctx.clearRect(0, 0, canvas.width, canvas.height);
+    ctx.font = Math.floor(cell / 2) + 'px sans-serif';
+    ctx.textAlign = 'center';
+    ctx.textBaseline = 'middle';
+    ctx.strokeStyle = 'gray';
+    
+    for (let y = 0; y < height; y++) {
+        for (let x = 0; x < width; x++) {
+            const value = grid[y][x];
+            if (value === '#') {
+                ctx.fillStyle = 'black';
+            } else if (value === 'S') {
+                ctx.fillStyle = 'green';
+            } else if (value === 'G') {
+                ctx.fillStyle = 'red';
+            } else {
+                ctx.fillStyle = marks[x + ',' + y] || 'white';
+            }
+            ctx.fillRect(x * cell, y * cell, cell, cell);
+            ctx.strokeRect(x * cell, y * cell, cell, cell);
+            
+            if (value === 'S' || value === 'G') {
+                ctx.fillStyle = 'black';
+                ctx.fillText(value, x * cell + cell / 2, y * cell + cell / 2);
+            }
+        }
+    }
+}
+
 $(document).ready(function() {
     // MIU System - Get Next States
     $('#miu-next-states-btn').click(function() {
@@ -107,14 +242,13 @@ $(document).ready(function() {
                 $('#miu-result-info').html(resultInfo);
                 
                 // Display graph
-                if (response.graph_image) {
-                    $('#miu-graph').attr('src', `data:image/png;base64,${response.graph_image}`);
+                $('#miu-search-result').show();
+                if (response.graph && response.graph.nodes.length > 0) {
                     $('#miu-graph-container').show();
+                    drawMiuGraph(document.getElementById('miu-graph'), response.graph);
                 } else {
                     $('#miu-graph-container').hide();
                 }
-                
-                $('#miu-search-result').show();
             },
             error: function() {
                 $('#miu-loading').hide();
@@ -160,10 +294,8 @@ $(document).ready(function() {
                 window.mazeData = response;
                 
                 // Display maze
-                if (response.maze_image) {
-                    $('#maze-image').attr('src', `data:image/png;base64,${response.maze_image}`);
-                    $('#maze-result').show();
-                }
+                $('#maze-result').show();
+                drawMaze(document.getElementById('maze-image'), response.grid);
                 
                 // Enable search button
                 $('#maze-search-form button').prop('disabled', false);
@@ -211,7 +343,7 @@ $(document).ready(function() {
                 
                 // Display results
                 let resultInfo = `<p><strong>Iterations:</strong> ${response.iterations}</p>`;
-                resultInfo += `<p><strong>Visited Nodes:</strong> ${response.visited_nodes_count}</p>`;
+                resultInfo += `<p><strong>Visited Cells:</strong> ${response.visited_nodes_count}</p>`;
                 
                 if (response.solution_found) {
                     resultInfo += `<p><strong>Solution Found:</strong> Yes</p>`;
@@ -242,12 +374,10 @@ $(document).ready(function() {
                 
                 $('#maze-result-info').html(resultInfo);
                 
-                // Display solution image
-                if (response.maze_solution_image) {
-                    $('#maze-solution-image').attr('src', `data:image/png;base64,${response.maze_solution_image}`);
-                }
-                
+                // Display the maze with the visited cells and the solution path
                 $('#maze-search-result').show();
+                drawMaze(document.getElementById('maze-solution-image'), window.mazeData.grid,
+                         response.visited, response.solution);
             },
             error: function() {
                 $('#maze-search-loading').hide();
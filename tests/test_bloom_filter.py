@@ -0,0 +1,40 @@
+import random
+import unittest
+
+from bloom_filter import BloomFilter
+
+CAPACITY = 20000
+
+
+class TestBloomFilter(unittest.TestCase):
+
+    def check_false_positives(self, added, others):
+        bloom = BloomFilter(CAPACITY)
+        for item in added:
+            bloom.add(item)
+        self.assertTrue(all(item in bloom for item in added))
+        rate = sum(item in bloom for item in others) / len(others)
+        # 10 bits and 4 hashes per item give about 1.2% at capacity
+        self.assertLess(rate, 2 * bloom.false_positive_rate())
+
+    def test_sequential_ints(self):
+        self.check_false_positives(range(CAPACITY), range(CAPACITY, 2 * CAPACITY))
+
+    def test_random_ints(self):
+        rng = random.Random(0)
+        items = rng.sample(range(1 << 32), 2 * CAPACITY)
+        self.check_false_positives(items[:CAPACITY], items[CAPACITY:])
+
+    def test_str_keys(self):
+        rng = random.Random(0)
+        items = list({"M" + "".join(rng.choice("IU") for _ in range(20)) for _ in range(2 * CAPACITY)})
+        self.check_false_positives(items[:CAPACITY], items[CAPACITY:2 * CAPACITY])
+
+    def test_empty_filter(self):
+        bloom = BloomFilter(100)
+        self.assertEqual(len(bloom), 0)
+        self.assertEqual(bloom.false_positive_rate(), 0)
+        self.assertNotIn("MI", bloom)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import random
+import unittest
+
+import miu_bits
+from miu_problem import MIUProblem, PackedMIUProblem, goal_reachable
+from miu_system import _next_states_impl, next_states
+
+try:
+    import miu_core
+except ImportError:
+    miu_core = None
+
+
+def random_miu_strings(count, seed=0):
+    """Random valid MIU strings, with the occasional extra M."""
+    rng = random.Random(seed)
+    return ["M" + "".join(rng.choice("MIIUU") for _ in range(rng.randint(1, 12)))
+            for _ in range(count)]
+
+
+class TestMIUKernels(unittest.TestCase):
+
+    def test_bytes_states_match_str(self):
+        for s in random_miu_strings(500):
+            expected = [t.encode() for t in _next_states_impl(s)]
+            self.assertEqual(list(_next_states_impl(s.encode())), expected)
+            self.assertEqual(list(next_states(s.encode())), expected)
+
+    def test_packed_rules_match_next_states(self):
+        for s in random_miu_strings(500):
+            packed = miu_bits.next_states_packed(*miu_bits.pack(s))
+            self.assertEqual([miu_bits.unpack(n, w) for n, w in packed], list(_next_states_impl(s)))
+
+    def test_packed_problem_matches_miu_problem(self):
+        for s in random_miu_strings(200):
+            problem = MIUProblem(s, "MU", use_invariants=False)
+            packed = PackedMIUProblem(s, "MU")
+            expected = problem.get_successors(s)
+            successors = packed.get_successors(packed.encode(s))
+            self.assertEqual([(a, packed.decode(t)) for a, t in successors], expected)
+
+    @unittest.skipIf(miu_core is None, "miu_core is not built")
+    def test_core_matches_next_states(self):
+        for s in random_miu_strings(500):
+            expected = [t.encode() for t in _next_states_impl(s)]
+            self.assertEqual(miu_core.next_states(s.encode()), expected)
+
+    def test_predecessors_invert_successors(self):
+        for s in random_miu_strings(200):
+            problem = MIUProblem(s, "MU", use_invariants=False)
+            for action, t in problem.get_successors(s):
+                self.assertIn((action, s), problem.get_predecessors(t))
+
+    def test_goal_reachable_never_rejects_a_derived_string(self):
+        for start in ["MI", "MIII", "MMI", "MUU", "UUM", "UUMI", "UMMUI"]:
+            frontier, seen = [start], {start}
+            while frontier and len(seen) < 500:
+                state = frontier.pop(0)
+                self.assertTrue(goal_reachable(start, state))
+                for t in next_states(state):
+                    if len(t) <= 12 and t not in seen:
+                        seen.add(t)
+                        frontier.append(t)
+        self.assertFalse(goal_reachable("MI", "MU"))
+        self.assertFalse(goal_reachable("MI", "UMI"))
+
+if __name__ == "__main__":
+    unittest.main()
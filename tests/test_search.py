@@ -0,0 +1,151 @@
+import unittest
+
+from maze_environment import Maze, MazeProblem, manhattan_distance
+from miu_problem import MIUProblem, PackedMIUProblem, miu_heuristic
+from search import (InternedProblem, StateTable, a_star_search, bidirectional_breadth_first_search,
+                    breadth_first_path_search, breadth_first_search)
+
+try:
+    import search_numba
+except ImportError:
+    search_numba = None
+
+# Goals reachable from MI and their shortest derivation lengths
+MIU_GOALS = {"MIU": 1, "MII": 1, "MIIIIU": 3, "MUI": 3, "MUIIU": 5}
+
+
+def solvable_mazes():
+    """Random mazes that have a path from start to goal."""
+    mazes = []
+    for seed in range(12):
+        maze = Maze(15, 12, 0.25, seed=seed)
+        if breadth_first_search(MazeProblem(maze), 10000)[0]:
+            mazes.append(maze)
+    return mazes
+
+
+def path_is_valid(problem, solution):
+    """Check that every step of the solution is a successor of the step before."""
+    path = solution.path()
+    if path[0].state != problem.initial_state or not problem.is_goal(path[-1].state):
+        return False
+    return all((node.action, node.state) in problem.get_successors(prev.state)
+               for prev, node in zip(path, path[1:]))
+
+
+@unittest.skipIf(search_numba is None, "numba is not installed")
+class TestCompiledGridSearch(unittest.TestCase):
+
+    def test_grid_search_path_costs(self):
+        for maze in solvable_mazes():
+            problem = MazeProblem(maze)
+            cost = breadth_first_search(problem, 10000)[0].path_cost
+            solution = search_numba.grid_breadth_first_search(problem, 10000)[0]
+            self.assertEqual(solution.path_cost, cost)
+            self.assertTrue(path_is_valid(problem, solution))
+
+
+class TestPackedMIUProblem(unittest.TestCase):
+
+    def test_path_costs(self):
+        for goal, cost in MIU_GOALS.items():
+            packed = PackedMIUProblem("MI", goal)
+            solution = breadth_first_search(packed, 5000)[0]
+            self.assertEqual(solution.path_cost, cost)
+            self.assertEqual(packed.decode(solution.state), goal)
+
+
+class TestAStarSearch(unittest.TestCase):
+
+    def test_maze_path_costs(self):
+        for maze in solvable_mazes():
+            problem = MazeProblem(maze)
+            cost = breadth_first_search(problem, 10000)[0].path_cost
+            self.assertEqual(a_star_search(problem, manhattan_distance, 10000)[0].path_cost, cost)
+
+
+class TestBidirectionalSearch(unittest.TestCase):
+
+    def test_miu_path_costs(self):
+        for goal, cost in MIU_GOALS.items():
+            problem = MIUProblem("MI", goal)
+            solution = bidirectional_breadth_first_search(problem, 5000)[0]
+            self.assertEqual(solution.path_cost, cost, goal)
+            self.assertTrue(path_is_valid(problem, solution))
+
+    def test_maze_path_costs(self):
+        mazes = solvable_mazes()
+        self.assertTrue(mazes)
+        for maze in mazes:
+            problem = MazeProblem(maze)
+            solution = bidirectional_breadth_first_search(problem, 10000)[0]
+            self.assertEqual(solution.path_cost, breadth_first_search(problem, 10000)[0].path_cost)
+            self.assertTrue(path_is_valid(problem, solution))
+
+
+@unittest.skipIf(search_numba is None, "numba is not installed")
+class TestCompiledMIUSearch(unittest.TestCase):
+
+    def assertSameSearch(self, expected, result):
+        self.assertEqual(result[2], expected[2])
+        self.assertEqual([(n.state, n.action, n.path_cost) for n in result[1]],
+                         [(n.state, n.action, n.path_cost) for n in expected[1]])
+        self.assertEqual(result[0] and result[0].state, expected[0] and expected[0].state)
+
+    def test_miu_search_matches_python(self):
+        problems = [MIUProblem("MI", goal) for goal in MIU_GOALS]
+        problems += [MIUProblem("MI", "MU"), MIUProblem("MI", "MU", use_invariants=False),
+                     MIUProblem("MI", "MIIIIU", max_length=6), MIUProblem(b"MI", b"MUIIU")]
+        for problem in problems:
+            for max_iterations in (1, 50, 300):
+                self.assertSameSearch(breadth_first_search(problem, max_iterations),
+                                      search_numba.miu_breadth_first_search(problem, max_iterations))
+
+
+class TestInternedProblem(unittest.TestCase):
+
+    def test_path_costs(self):
+        for goal, cost in MIU_GOALS.items():
+            table = StateTable()
+            interned = InternedProblem(MIUProblem("MI", goal), table)
+            solution = breadth_first_search(interned, 5000)[0]
+            self.assertEqual(solution.path_cost, cost)
+            self.assertEqual(interned.decode(solution.state), goal)
+            self.assertEqual(table[table.intern("MI")], "MI")
+
+    def test_interned_heuristic(self):
+        interned = InternedProblem(MIUProblem("MI", "MIIIIU"))
+        solution = a_star_search(interned, interned.heuristic(miu_heuristic), 5000)[0]
+        self.assertEqual(interned.decode(solution.state), "MIIIIU")
+
+
+class TestPathSearch(unittest.TestCase):
+
+    def test_miu_path_costs(self):
+        for goal, cost in MIU_GOALS.items():
+            problem = MIUProblem("MI", goal)
+            solution = breadth_first_path_search(problem, 5000)[0]
+            self.assertEqual(solution.path_cost, cost, goal)
+            self.assertTrue(path_is_valid(problem, solution))
+
+    def test_maze_path_costs(self):
+        mazes = solvable_mazes()
+        self.assertTrue(mazes)
+        for maze in mazes:
+            problem = MazeProblem(maze)
+            solution = breadth_first_path_search(problem, 10000)[0]
+            self.assertEqual(solution.path_cost, breadth_first_search(problem, 10000)[0].path_cost)
+            self.assertTrue(path_is_valid(problem, solution))
+
+
+class TestUnreachableGoal(unittest.TestCase):
+
+    def test_searches_stop_at_once(self):
+        for search in (breadth_first_search, breadth_first_path_search,
+                       bidirectional_breadth_first_search):
+            solution, _, iterations = search(MIUProblem("MI", "MU"), 1000)
+            self.assertIsNone(solution)
+            self.assertEqual(iterations, 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,18 +3,17 @@ Simple web interface for the AI Agent using Python's built-in HTTP server.
 """
 
 import http.server
-import socketserver
-import json
-import urllib.parse
+import orjson
 import os
-import base64
-import io
-import matplotlib.pyplot as plt
-import matplotlib
-matplotlib.use('Agg')  # Use non-interactive backend
+import functools
+import hashlib
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.colors import ListedColormap
+from matplotlib.figure import Figure
+import numpy as np
+from PIL import Image
+import tempfile
 import threading
-import time
-from datetime import datetime
 
 from miu_system import next_states, is_valid_miu_string
 from miu_problem import MIUProblem, miu_heuristic
@@ -25,10 +24,118 @@ from search import breadth_first_search, depth_first_search, a_star_search
 os.makedirs('static', exist_ok=True)
 os.makedirs('static/images', exist_ok=True)
 
-# Global variables to store state
+# Global variables to store state; requests run in parallel threads, so
+# current_maze is only read or replaced while holding current_maze_lock
 current_maze = None
+current_maze_lock = threading.Lock()
 search_results = {}
 
+# Maze cell codes and their colors, for drawing a whole maze with one imshow
+EMPTY, WALL, START, GOAL, VISITED, PATH = range(6)
+MAZE_CMAP = ListedColormap(['white', 'black', 'green', 'red', 'lightblue', 'yellow'])
+
+def new_figure(figsize):
+    """
+    Create a figure with an Agg canvas and a single set of axes.
+    
+    The figure is not registered with pyplot, so it needs no global backend
+    setup and concurrent requests never share drawing state.
+    
+    Args:
+        figsize (tuple): The figure size in inches
+        
+    Returns:
+        tuple: The figure and its axes
+    """
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig, fig.add_subplot()
+
+def save_png(fig, name):
+    """
+    Render a figure and store it as a PNG under a content-hashed name in static/images.
+    
+    The RGBA buffer of the Agg canvas is handed straight to Pillow, which
+    skips the savefig machinery. Requests run concurrently, so the name comes
+    from the pixels rather than the time: different images never share a
+    file, and identical renders are written once.
+    
+    Args:
+        fig (Figure): A figure created by new_figure
+        name (str): Prefix of the file name
+        
+    Returns:
+        str: URL of the PNG image
+    """
+    fig.canvas.draw()
+    pixels = np.asarray(fig.canvas.buffer_rgba())
+    digest = hashlib.blake2b(pixels.tobytes(), digest_size=8).hexdigest()
+    filename = f"static/images/{name}_{digest}.png"
+    if not os.path.exists(filename):
+        # Write to a temporary file first so no request sees a partial image
+        fd, tmp_path = tempfile.mkstemp(dir='static/images', suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            Image.fromarray(pixels).save(f, 'PNG', optimize=False)
+        os.replace(tmp_path, filename)
+    
+    return '/' + filename
+
+@functools.lru_cache(maxsize=64)
+def miu_graph_layout(edges):
+    """
+    Compute node positions for an MIU search graph, cached by its edges.
+    
+    Repeating a search draws the same graph, so its layout is reused rather
+    than computed again. The spring layout is seeded, so a cache miss for a
+    graph that was drawn before still gives the same picture.
+    
+    Args:
+        edges (frozenset): The (parent, child) state pairs of the graph
+        
+    Returns:
+        dict: The position of every state, not to be modified
+    """
+    import networkx as nx
+    
+    # Set order depends on the string hash seed, so the graph is built from
+    # the sorted edges to give every process the same node order
+    graph = nx.DiGraph(sorted(edges))
+    
+    # Use spring layout for small graphs, shell layout for larger ones
+    if len(graph) < 20:
+        return nx.spring_layout(graph, seed=0)
+    return nx.shell_layout(graph)
+
+def draw_maze_cells(ax, maze, visited_positions=(), solution_positions=()):
+    """
+    Draw the cells of a maze onto the axes with a single imshow call.
+    
+    Args:
+        ax (Axes): The axes to draw on
+        maze (Maze): The maze
+        visited_positions (iterable): (x, y) cells to mark as visited
+        solution_positions (iterable): (x, y) cells to mark as the solution path
+    """
+    cells = np.array(maze.grid).reshape(maze.height, maze.width)
+    codes = np.full((maze.height, maze.width), EMPTY, np.uint8)
+    
+    # Later assignments win, so the start, goal and walls stay on top
+    for code, positions in ((VISITED, visited_positions), (PATH, solution_positions)):
+        coords = np.array(list(positions), dtype=np.intp).reshape(-1, 2)
+        codes[coords[:, 1], coords[:, 0]] = code
+    codes[cells == '#'] = WALL
+    codes[cells == 'S'] = START
+    codes[cells == 'G'] = GOAL
+    
+    # The extent puts cell (x, y) at [x, x+1] x [y, y+1] with y growing downwards
+    ax.imshow(codes, cmap=MAZE_CMAP, vmin=0, vmax=len(MAZE_CMAP.colors) - 1,
+              interpolation='nearest', extent=(0, maze.width, maze.height, 0))
+    ax.set_aspect('equal')
+    
+    for label in ('S', 'G'):
+        for y, x in np.argwhere(cells == label):
+            ax.text(x + 0.5, y + 0.5, label, ha='center', va='center')
+
 class AIAgentHandler(http.server.SimpleHTTPRequestHandler):
     """Custom HTTP request handler for the AI Agent web interface."""
     
@@ -54,7 +161,7 @@ class AIAgentHandler(http.server.SimpleHTTPRequestHandler):
             self.send_response(400)
             self.send_header('Content-type', 'application/json')
             self.end_headers()
-            self.wfile.write(json.dumps({'error': 'API endpoints require POST requests'}).encode())
+            self.wfile.write(orjson.dumps({'error': 'API endpoints require POST requests'}))
             return
         
         # Default: serve 404
@@ -66,16 +173,16 @@ class AIAgentHandler(http.server.SimpleHTTPRequestHandler):
     def do_POST(self):
         """Handle POST requests."""
         content_length = int(self.headers['Content-Length'])
-        post_data = self.rfile.read(content_length).decode('utf-8')
+        post_data = self.rfile.read(content_length)
         
-        # Parse JSON data
+        # Parse JSON data; orjson reads the UTF-8 bytes directly
         try:
-            data = json.loads(post_data)
-        except json.JSONDecodeError:
+            data = orjson.loads(post_data)
+        except orjson.JSONDecodeError:
             self.send_response(400)
             self.send_header('Content-type', 'application/json')
             self.end_headers()
-            self.wfile.write(json.dumps({'error': 'Invalid JSON'}).encode())
+            self.wfile.write(orjson.dumps({'error': 'Invalid JSON'}))
             return
         
         # API endpoints
@@ -91,7 +198,7 @@ class AIAgentHandler(http.server.SimpleHTTPRequestHandler):
             self.send_response(404)
             self.send_header('Content-type', 'application/json')
             self.end_headers()
-            self.wfile.write(json.dumps({'error': 'Endpoint not found'}).encode())
+            self.wfile.write(orjson.dumps({'error': 'Endpoint not found'}))
     
     def handle_miu_next_states(self, data):
         """Handle MIU next states API endpoint."""
@@ -101,7 +208,7 @@ class AIAgentHandler(http.server.SimpleHTTPRequestHandler):
             self.send_response(400)
             self.send_header('Content-type', 'application/json')
             self.end_headers()
-            self.wfile.write(json.dumps({'error': 'Invalid MIU string'}).encode())
+            self.wfile.write(orjson.dumps({'error': 'Invalid MIU string'}))
             return
         
         result = next_states(state)
@@ -109,7 +216,7 @@ class AIAgentHandler(http.server.SimpleHTTPRequestHandler):
         self.send_response(200)
         self.send_header('Content-type', 'application/json')
         self.end_headers()
-        self.wfile.write(json.dumps({'next_states': result}).encode())
+        self.wfile.write(orjson.dumps({'next_states': result}))
     
     def handle_miu_search(self, data):
         """Handle MIU search API endpoint."""
@@ -122,7 +229,7 @@ class AIAgentHandler(http.server.SimpleHTTPRequestHandler):
             self.send_response(400)
             self.send_header('Content-type', 'application/json')
             self.end_headers()
-            self.wfile.write(json.dumps({'error': 'Invalid MIU string'}).encode())
+            self.wfile.write(orjson.dumps({'error': 'Invalid MIU string'}))
             return
         
         # Create the problem
@@ -139,7 +246,7 @@ class AIAgentHandler(http.server.SimpleHTTPRequestHandler):
             self.send_response(400)
             self.send_header('Content-type', 'application/json')
             self.end_headers()
-            self.wfile.write(json.dumps({'error': 'Invalid algorithm'}).encode())
+            self.wfile.write(orjson.dumps({'error': 'Invalid algorithm'}))
             return
         
         # Prepare the result
@@ -169,15 +276,12 @@ class AIAgentHandler(http.server.SimpleHTTPRequestHandler):
                     })
         
         # Generate a visualization of the search
-        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-        filename = f"static/images/miu_graph_{timestamp}.png"
-        self.generate_miu_graph(visited_nodes, solution, filename)
-        result['graph_image'] = f"/static/images/miu_graph_{timestamp}.png"
+        result['graph_image'] = self.generate_miu_graph(visited_nodes, solution)
         
         self.send_response(200)
         self.send_header('Content-type', 'application/json')
         self.end_headers()
-        self.wfile.write(json.dumps(result).encode())
+        self.wfile.write(orjson.dumps(result))
     
     def handle_maze_generate(self, data):
         """Handle maze generation API endpoint."""
@@ -192,54 +296,55 @@ class AIAgentHandler(http.server.SimpleHTTPRequestHandler):
             self.send_response(400)
             self.send_header('Content-type', 'application/json')
             self.end_headers()
-            self.wfile.write(json.dumps({'error': 'Invalid maze parameters'}).encode())
+            self.wfile.write(orjson.dumps({'error': 'Invalid maze parameters'}))
             return
         
         # Generate the maze
-        current_maze = Maze(width, height, wall_prob, seed)
+        maze = Maze(width, height, wall_prob, seed)
+        with current_maze_lock:
+            current_maze = maze
         
         # Convert the maze to a 2D array for JSON
         maze_grid = []
-        for y in range(current_maze.height):
+        for y in range(maze.height):
             row = []
-            for x in range(current_maze.width):
-                row.append(current_maze.grid[y][x])
+            for x in range(maze.width):
+                row.append(maze.grid[y][x])
             maze_grid.append(row)
         
         # Generate a visualization of the maze
-        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-        filename = f"static/images/maze_{timestamp}.png"
-        self.generate_maze_image(current_maze, filename)
+        maze_image = self.generate_maze_image(maze)
         
         result = {
-            'width': current_maze.width,
-            'height': current_maze.height,
+            'width': maze.width,
+            'height': maze.height,
             'grid': maze_grid,
-            'start': current_maze.start,
-            'goal': current_maze.goal,
-            'maze_image': f"/static/images/maze_{timestamp}.png"
+            'start': maze.start,
+            'goal': maze.goal,
+            'maze_image': maze_image
         }
         
         self.send_response(200)
         self.send_header('Content-type', 'application/json')
         self.end_headers()
-        self.wfile.write(json.dumps(result).encode())
+        self.wfile.write(orjson.dumps(result))
     
     def handle_maze_search(self, data):
         """Handle maze search API endpoint."""
-        global current_maze
+        with current_maze_lock:
+            maze = current_maze
         
-        if not current_maze:
+        if not maze:
             self.send_response(400)
             self.send_header('Content-type', 'application/json')
             self.end_headers()
-            self.wfile.write(json.dumps({'error': 'No maze generated'}).encode())
+            self.wfile.write(orjson.dumps({'error': 'No maze generated'}))
             return
         
         algorithm = data.get('algorithm', 'astar')
         
         # Create the problem
-        problem = MazeProblem(current_maze)
+        problem = MazeProblem(maze)
         
         # Run the search algorithm
         if algorithm == 'bfs':
@@ -252,7 +357,7 @@ class AIAgentHandler(http.server.SimpleHTTPRequestHandler):
             self.send_response(400)
             self.send_header('Content-type', 'application/json')
             self.end_headers()
-            self.wfile.write(json.dumps({'error': 'Invalid algorithm'}).encode())
+            self.wfile.write(orjson.dumps({'error': 'Invalid algorithm'}))
             return
         
         # Prepare the result
@@ -282,18 +387,15 @@ class AIAgentHandler(http.server.SimpleHTTPRequestHandler):
                     })
         
         # Generate a visualization of the maze with the solution path
-        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-        filename = f"static/images/maze_solution_{timestamp}.png"
-        self.generate_maze_solution(current_maze, solution, visited_nodes, filename)
-        result['maze_solution_image'] = f"/static/images/maze_solution_{timestamp}.png"
+        result['maze_solution_image'] = self.generate_maze_solution(maze, solution, visited_nodes)
         
         self.send_response(200)
         self.send_header('Content-type', 'application/json')
         self.end_headers()
-        self.wfile.write(json.dumps(result).encode())
+        self.wfile.write(orjson.dumps(result))
     
-    def generate_miu_graph(self, visited_nodes, solution, filename):
-        """Generate a visualization of the MIU search graph."""
+    def generate_miu_graph(self, visited_nodes, solution):
+        """Generate a visualization of the MIU search graph and return its URL."""
         import networkx as nx
         
         # Build the graph
@@ -302,16 +404,12 @@ class AIAgentHandler(http.server.SimpleHTTPRequestHandler):
             if node.parent:
                 graph.add_edge(node.parent.state, node.state)
         
-        # Use spring layout for small graphs, shell layout for larger ones
-        if len(graph) < 20:
-            pos = nx.spring_layout(graph)
-        else:
-            pos = nx.shell_layout(graph)
+        pos = miu_graph_layout(frozenset(graph.edges))
         
-        plt.figure(figsize=(10, 8))
+        fig, ax = new_figure((10, 8))
         
         # Draw the graph
-        nx.draw(graph, pos, with_labels=True, 
+        nx.draw(graph, pos, ax=ax, with_labels=True, 
                node_color="lightblue", node_size=500, font_size=8,
                edge_color="gray", arrows=True)
         
@@ -320,53 +418,30 @@ class AIAgentHandler(http.server.SimpleHTTPRequestHandler):
             path_states = [n.state for n in solution.path()]
             path_edges = [(path_states[i], path_states[i+1]) for i in range(len(path_states)-1)]
             
-            nx.draw_networkx_nodes(graph, pos, nodelist=path_states,
+            nx.draw_networkx_nodes(graph, pos, ax=ax, nodelist=path_states,
                                  node_color="green", node_size=500)
-            nx.draw_networkx_edges(graph, pos, edgelist=path_edges,
+            nx.draw_networkx_edges(graph, pos, ax=ax, edgelist=path_edges,
                                  edge_color="green", width=2)
         
-        plt.title("MIU System Search Graph")
-        plt.savefig(filename)
-        plt.close()
+        ax.set_title("MIU System Search Graph")
+        return save_png(fig, "miu_graph")
     
-    def generate_maze_image(self, maze, filename):
-        """Generate a visualization of a maze."""
-        plt.figure(figsize=(10, 10))
-        
-        # Create a grid of colored cells
-        for y in range(maze.height):
-            for x in range(maze.width):
-                cell = maze.grid[y][x]
-                if cell == '#':
-                    plt.fill([x, x+1, x+1, x], [y, y, y+1, y+1], 'black')
-                elif cell == 'S':
-                    plt.fill([x, x+1, x+1, x], [y, y, y+1, y+1], 'green')
-                    plt.text(x + 0.5, y + 0.5, 'S', ha='center', va='center')
-                elif cell == 'G':
-                    plt.fill([x, x+1, x+1, x], [y, y, y+1, y+1], 'red')
-                    plt.text(x + 0.5, y + 0.5, 'G', ha='center', va='center')
-                else:
-                    plt.fill([x, x+1, x+1, x], [y, y, y+1, y+1], 'white')
+    def generate_maze_image(self, maze):
+        """Generate a visualization of a maze and return its URL."""
+        fig, ax = new_figure((10, 10))
         
-        # Set the limits and aspect ratio
-        plt.xlim(0, maze.width)
-        plt.ylim(0, maze.height)
-        plt.gca().invert_yaxis()  # Invert y-axis to match grid coordinates
-        plt.gca().set_aspect('equal')
+        # Draw all cells as one image
+        draw_maze_cells(ax, maze)
         
         # Remove ticks
-        plt.xticks([])
-        plt.yticks([])
+        ax.set_xticks([])
+        ax.set_yticks([])
         
-        plt.title("Maze")
-        plt.savefig(filename)
-        plt.close()
+        ax.set_title("Maze")
+        return save_png(fig, "maze")
     
-    def generate_maze_solution(self, maze, solution, visited_nodes, filename):
-        """Generate a visualization of a maze with solution path."""
-        # Create a copy of the maze grid for visualization
-        grid = [row[:] for row in maze.grid]
-        
+    def generate_maze_solution(self, maze, solution, visited_nodes):
+        """Generate a visualization of a maze with solution path and return its URL."""
         # Mark visited nodes
         visited_positions = set()
         for node in visited_nodes:
@@ -383,40 +458,17 @@ class AIAgentHandler(http.server.SimpleHTTPRequestHandler):
                     x, y = node.state
                     solution_positions.add((x, y))
         
-        plt.figure(figsize=(10, 10))
-        
-        # Create a grid of colored cells
-        for y in range(maze.height):
-            for x in range(maze.width):
-                cell = grid[y][x]
-                if cell == '#':
-                    plt.fill([x, x+1, x+1, x], [y, y, y+1, y+1], 'black')
-                elif cell == 'S':
-                    plt.fill([x, x+1, x+1, x], [y, y, y+1, y+1], 'green')
-                    plt.text(x + 0.5, y + 0.5, 'S', ha='center', va='center')
-                elif cell == 'G':
-                    plt.fill([x, x+1, x+1, x], [y, y, y+1, y+1], 'red')
-                    plt.text(x + 0.5, y + 0.5, 'G', ha='center', va='center')
-                elif (x, y) in solution_positions:
-                    plt.fill([x, x+1, x+1, x], [y, y, y+1, y+1], 'yellow')
-                elif (x, y) in visited_positions:
-                    plt.fill([x, x+1, x+1, x], [y, y, y+1, y+1], 'lightblue')
-                else:
-                    plt.fill([x, x+1, x+1, x], [y, y, y+1, y+1], 'white')
+        fig, ax = new_figure((10, 10))
         
-        # Set the limits and aspect ratio
-        plt.xlim(0, maze.width)
-        plt.ylim(0, maze.height)
-        plt.gca().invert_yaxis()  # Invert y-axis to match grid coordinates
-        plt.gca().set_aspect('equal')
+        # Draw all cells as one image
+        draw_maze_cells(ax, maze, visited_positions, solution_positions)
         
         # Remove ticks
-        plt.xticks([])
-        plt.yticks([])
+        ax.set_xticks([])
+        ax.set_yticks([])
         
-        plt.title("Maze with Solution Path")
-        plt.savefig(filename)
-        plt.close()
+        ax.set_title("Maze with Solution Path")
+        return save_png(fig, "maze_solution")
 
 
 def run_server(port=8000):
@@ -426,7 +478,8 @@ def run_server(port=8000):
     # Set the directory for serving static files
     handler.directory = os.getcwd()
     
-    with socketserver.TCPServer(("", port), handler) as httpd:
+    # Each request gets its own thread, so a long search does not block others
+    with http.server.ThreadingHTTPServer(("", port), handler) as httpd:
         print(f"Serving at http://localhost:{port}")
         httpd.serve_forever()
 